@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+
+import pandas
+import pytest
+from conftest import YEARS, seasonal_temperatures, series_dates
+import compute
+
+__author__ = "TheoLevalet"
+__copyright__ = "TheoLevalet"
+__license__ = "mit"
+
+
+@pytest.mark.parametrize("years", YEARS)
+@pytest.mark.parametrize("metric", list(compute.METRICS))
+def test_stats_between_series(benchmark, metric, years):
+    dates = series_dates(years)
+    values_1 = pandas.Series(seasonal_temperatures(dates, 0), name="Temperature")
+    values_2 = pandas.Series(seasonal_temperatures(dates, 1), name="Temperature")
+    dates = pandas.Series(dates, name="full_date")
+
+    stats = benchmark(
+        compute.stats_between_series,
+        xaxis_1=dates,
+        values_1=values_1,
+        xaxis_2=dates,
+        values_2=values_2,
+        metrics=(metric,),
+    )
+
+    assert stats[metric] >= 0
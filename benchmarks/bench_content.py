@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from conftest import CITIES, YEARS, series_dates
+import cleaning
+import content
+
+__author__ = "TheoLevalet"
+__copyright__ = "TheoLevalet"
+__license__ = "mit"
+
+
+@pytest.mark.parametrize("cities", CITIES)
+@pytest.mark.parametrize("years", YEARS)
+def test_read_all_capitals_spreadsheets(
+    benchmark, monkeypatch, capitals_csv, years, cities
+):
+    monkeypatch.setenv("ALL_CAPITALS_SPREADSHEETS", capitals_csv(years, cities))
+
+    spreadsheets = benchmark(content.read_all_capitals_spreadsheets)
+
+    assert len(spreadsheets) == len(series_dates(years)) * cities
+
+
+@pytest.mark.parametrize("cities", CITIES)
+@pytest.mark.parametrize("years", YEARS)
+def test_create_date_column(benchmark, monkeypatch, capitals_csv, years, cities):
+    monkeypatch.setenv("ALL_CAPITALS_SPREADSHEETS", capitals_csv(years, cities))
+    spreadsheets = content.read_all_capitals_spreadsheets()
+
+    dates = benchmark(
+        content.create_date_column,
+        spreadsheets["Year"],
+        spreadsheets["Month"],
+        spreadsheets["Day"],
+    )
+
+    assert dates.notna().all()
+
+
+@pytest.mark.parametrize("method", sorted(cleaning.METHODS))
+@pytest.mark.parametrize("cities", CITIES)
+@pytest.mark.parametrize("years", YEARS)
+def test_clean_outliers(benchmark, monkeypatch, capitals_csv, years, cities, method):
+    monkeypatch.setenv("ALL_CAPITALS_SPREADSHEETS", capitals_csv(years, cities))
+    spreadsheets = content.read_all_capitals_spreadsheets()
+
+    cleaned = benchmark(
+        cleaning.clean_outliers,
+        spreadsheets["Temperature"],
+        groups=spreadsheets["Capital"],
+        method=method,
+        threshold=10 if method == "rolling_mean" else 3,
+    )
+
+    assert len(cleaned["counts"]) == cities
+
+
+@pytest.mark.parametrize("cities", CITIES)
+@pytest.mark.parametrize("years", YEARS)
+def test_get_references_statistics(
+    benchmark, monkeypatch, capitals_csv, stacked_temperatures, years, cities
+):
+    monkeypatch.setenv("ALL_CAPITALS_SPREADSHEETS", capitals_csv(years, cities))
+
+    # Reads, cleans, scores the capitals and builds their charts, up to minutes a round
+    references = benchmark.pedantic(
+        content.get_references_statistics,
+        kwargs={"stacked_temperatures": stacked_temperatures},
+        rounds=1,
+    )
+
+    assert len(references) == 5
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+import json
+import pandas
+import plotly
+import pytest
+from conftest import CITIES, YEARS, seasonal_temperatures, series_dates
+import content
+import core
+import dashboard
+
+__author__ = "TheoLevalet"
+__copyright__ = "TheoLevalet"
+__license__ = "mit"
+
+
+@pytest.mark.parametrize("years", YEARS)
+def test_build_time_series_chart(benchmark, years):
+    dates = series_dates(years)
+
+    chart = benchmark(
+        dashboard.build_time_series_chart,
+        id="annual-graph-benchmark",
+        dates=pandas.Series(dates),
+        data_list=[
+            pandas.Series(seasonal_temperatures(dates, seed), name=str(seed))
+            for seed in range(3)
+        ],
+        layout={"title": "Annual temperatures"},
+        all_=True,
+    )
+
+    assert chart is not None
+
+
+@pytest.fixture(scope="module")
+def report_tabs(capitals_csv, stacked_temperatures):
+    """Components of the three tabs by years, only the 5 best references are displayed"""
+    statistics = [
+        dashboard.build_time_series_chart(
+            id="annual-graph-" + name,
+            dates=stacked["full_date"],
+            data_list=[stacked["Temperature"]],
+            layout={"title": "Annual temperatures"},
+        )
+        for name, stacked in zip(["si", "si-erreur"], stacked_temperatures)
+    ]
+    tabs = {}
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        for years in YEARS:
+            monkeypatch.setenv(
+                "ALL_CAPITALS_SPREADSHEETS", capitals_csv(years, CITIES[0])
+            )
+            references = content.get_references_statistics(
+                stacked_temperatures=stacked_temperatures
+            )
+            tabs[years] = [
+                [statistics[0]],
+                [statistics[1]],
+                [
+                    component
+                    for reference in references
+                    for component in (
+                        reference["visual_header"],
+                        reference["comparision_summary"],
+                        reference["annual_graph"],
+                    )
+                ],
+            ]
+
+    return tabs
+
+
+@pytest.mark.parametrize("years", YEARS)
+def test_build_app_report(benchmark, report_tabs, years):
+    def build():
+        # Layout construction and its serialization, as sent to the browser
+        report = core.build_report(
+            tabs=report_tabs[years], warm_stages=lambda: {}, get_explorer=None
+        )
+        return json.dumps(report.layout, cls=plotly.utils.PlotlyJSONEncoder)
+
+    assert "annual-graph-si" in benchmark(build)
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Fixtures of the benchmarks: settings and datasets of several sizes from `synthetic`.
+
+The modules of the package import each other as top-level modules, as when
+running `python src/capital_problem/core.py`, so their directory is put on the path.
+"""
+
+import os
+import sys
+import numpy
+import pandas
+import pytest
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "src", "capital_problem"
+    ),
+)
+
+# Years of the series, from 365 days to ten years
+YEARS = [1, 10]
+
+# Cities of the capitals dataset
+CITIES = [30, 300]
+
+# Settings of the benchmarks, set before the modules read them at import. Caches are
+# disabled so every round computes everything
+SETTINGS = {
+    "CLIMATE_SHEET_SI": "SI ",
+    "CLIMATE_SHEET_SI_ERROR": "SI -erreur",
+    "ALL_CAPITALS_SPREADSHEETS_COLUMNS": "Year,Month,Day,AvgTemperature,City,Region",
+    "REFERENCES_YEARS": "",
+    "REFERENCES_REGIONS": "",
+    "CAPITALS_LIST": "",
+    "REFERENCES_STORE": "",
+    "CACHE_PATH": "",
+    "STATS_CACHE_SIZE": "0",
+    "DTW_WINDOW": "0",
+    "REFERENCES_SHORTLIST": "0",
+    "REFERENCES_WORKERS": "1",
+    "MONTH_COLUMNS": "1,2,3,4,5,6,7,8,9,10,11,12",
+    "DEBUG": "0",
+}
+os.environ.update(SETTINGS)
+
+import synthetic
+
+
+def seasonal_temperatures(dates: pandas.DatetimeIndex, seed: int = 0) -> numpy.ndarray:
+    return synthetic.seasonal_temperatures(dates, random=numpy.random.default_rng(seed))
+
+
+def series_dates(years: int) -> pandas.DatetimeIndex:
+    """Days of the last years up to 2018"""
+    return pandas.date_range(str(2019 - years) + "-01-01", "2018-12-31")
+
+
+@pytest.fixture(scope="session")
+def stacked_temperatures():
+    """Stacked temperatures of the SI and SI-erreur sheets, as `content.get_statistics`"""
+    dates = series_dates(1)
+
+    return [
+        pandas.DataFrame(
+            {
+                "Day": dates.day,
+                "Month": dates.month,
+                "Year": dates.year,
+                "full_date": dates,
+                "Temperature": seasonal_temperatures(dates, seed),
+            }
+        )
+        for seed in range(2)
+    ]
+
+
+@pytest.fixture(scope="session")
+def capitals_csv(tmp_path_factory):
+    """Factory writing a csv in the schema of the Kaggle dataset, once by size"""
+    paths = {}
+
+    def write(years: int, cities: int) -> str:
+        if (years, cities) not in paths:
+            path = tmp_path_factory.mktemp("capitals") / "city_temperature.csv"
+            synthetic.write_capitals_csv(
+                str(path),
+                cities=cities,
+                years=list(range(2019 - years, 2019)),
+                missing_rate=0,
+            )
+            paths[(years, cities)] = str(path)
+
+        return paths[(years, cities)]
+
+    return write
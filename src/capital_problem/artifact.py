@@ -0,0 +1,157 @@
+import datetime
+import importlib
+import json
+import os
+import tempfile
+import plotly.utils
+
+# Bump when the content of the artifact changes
+ARTIFACT_VERSION = 4
+
+# Modules the components of an artifact are rebuilt from
+COMPONENT_NAMESPACES = (
+    "dash_html_components",
+    "dash_core_components",
+    "dash_table",
+    "dash_bootstrap_components",
+)
+
+
+def get_sources(paths: list, settings: dict) -> dict:
+    """Describe the inputs of a report, as `cache.cache_key` keys the stages
+
+    Args:
+        paths (list): input files, described by path, size and modification time
+        settings (dict): configuration values the report depends on
+
+    Returns:
+        dict: `{"files", "settings"}` json value, a missing file has no size nor time
+    """
+    files = []
+
+    for path in paths:
+        if os.path.isfile(path):
+            status = os.stat(path)
+            files.append([os.path.abspath(path), status.st_size, status.st_mtime_ns])
+        else:
+            files.append([os.path.abspath(path), None, None])
+
+    return {"files": files, "settings": settings}
+
+
+def save(
+    path: str,
+    tabs: dict,
+    rankings: list,
+    stages: list,
+    sources: dict = None,
+    series: dict = None,
+):
+    """Serialize the report into one json file
+
+    Args:
+        path (str): path of the artifact, replaced atomically
+        tabs (dict): dash components of each tab, as `{tab value: list}`
+        rankings (list): scores and metrics of the displayed capitals
+        stages (list): stages computed to build the report
+        sources (dict, optional): inputs of the report, from `get_sources`. Defaults to None.
+        series (dict, optional): full resolution series of the large graphs, by name. Defaults to None.
+    """
+    payload = {
+        "version": ARTIFACT_VERSION,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "sources": sources,
+        "stages": stages,
+        "rankings": rankings,
+        "tabs": tabs,
+        "series": series or {},
+    }
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory)
+
+    # Plotly encoder serializes components, figures, numpy arrays and timestamps
+    with os.fdopen(descriptor, "w") as file:
+        file.write(json.dumps(payload, cls=plotly.utils.PlotlyJSONEncoder))
+
+    os.chmod(temporary_path, 0o644)
+    os.replace(temporary_path, path)
+
+
+def load(path: str, sources: dict = None) -> dict:
+    """Load an artifact written by `save`, without pandas nor the input files
+
+    Args:
+        path (str): path of the artifact
+        sources (dict, optional): current inputs of the report, from `get_sources`, the
+            artifact is stale when they differ from its own. Defaults to None (not checked).
+
+    Raises:
+        ValueError: the artifact has another version, or is stale
+
+    Returns:
+        dict: `{"version", "created", "sources", "stages", "rankings", "tabs", "series", "components"}`
+        with `tabs` as dash components and `components` the components having an id, by
+        `component_key`
+    """
+    with open(path) as file:
+        payload = json.load(file)
+
+    if payload.get("version") != ARTIFACT_VERSION:
+        raise ValueError("Unsupported artifact version, build the report again")
+
+    if sources is not None and payload["sources"] != sources:
+        raise ValueError("Stale artifact, build the report again")
+
+    payload["components"] = {}
+    payload["tabs"] = {
+        tab: decode_component(children, payload["components"])
+        for tab, children in payload["tabs"].items()
+    }
+
+    return payload
+
+
+def decode_component(value, components: dict = None):
+    """Rebuild the dash components of a json value
+
+    Args:
+        value: json value, components are `{"type", "namespace", "props"}` objects
+        components (dict, optional): filled with the rebuilt components having an id. Defaults to None.
+
+    Returns:
+        the value with its components rebuilt
+    """
+    if isinstance(value, list):
+        return [decode_component(element, components) for element in value]
+
+    if not isinstance(value, dict) or set(value) != {"type", "namespace", "props"}:
+        return value
+
+    if value["namespace"] not in COMPONENT_NAMESPACES:
+        raise ValueError("Unknown component namespace " + str(value["namespace"]))
+
+    component = getattr(importlib.import_module(value["namespace"]), value["type"])(
+        **{
+            name: decode_component(prop, components)
+            for name, prop in value["props"].items()
+        }
+    )
+
+    if components is not None and "id" in value["props"]:
+        components[component_key(value["props"]["id"])] = component
+
+    return component
+
+
+def component_key(id) -> str:
+    """Key of a component id, pattern-matching ids are dicts and can't be dict keys
+
+    Args:
+        id (str or dict): id of the component
+
+    Returns:
+        str: the id itself for a string, its json with sorted keys for a dict
+    """
+    return id if isinstance(id, str) else json.dumps(id, sort_keys=True)
@@ -0,0 +1,46 @@
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    zoom: {
+        // Same behaviour as `callbacks.zoom_in_dates`, only the x axis range changes
+        zoom_in_dates: function (clickData, previous_state, figure, granularity) {
+            var previous = previous_state ? JSON.parse(previous_state) : null;
+            var x_axis = figure.data[0].x;
+            var range = null;
+
+            if (
+                (previous && JSON.stringify(previous) === JSON.stringify(clickData)) ||
+                (previous && !clickData)
+            ) {
+                // Click on the same point or unselect : unzoom and reset previous state
+                range = [x_axis[0], x_axis[x_axis.length - 1]];
+                previous = null;
+            } else {
+                // Click on a point : update the range
+                if (clickData && clickData.points && clickData.points[0].pointIndex) {
+                    var index = parseInt(clickData.points[0].pointIndex);
+                    var range_min = index - granularity;
+                    var range_max = index + granularity - (range_min < 0 ? range_min : 0);
+
+                    range_min -= range_max > x_axis.length ? range_max : 0;
+                    range_min = range_min > 0 ? range_min : 0;
+                    range_max = range_max < x_axis.length ? range_max : x_axis.length - 1;
+                    range = [x_axis[range_min], x_axis[range_max]];
+                }
+                previous = clickData;
+            }
+
+            if (!range) {
+                return [window.dash_clientside.no_update, JSON.stringify(previous)];
+            }
+
+            var layout = Object.assign({}, figure.layout, {
+                margin: Object.assign({}, figure.layout.margin, {pad: 10}),
+                xaxis: Object.assign({}, figure.layout.xaxis, {
+                    range: range,
+                    autorange: false,
+                }),
+            });
+
+            return [Object.assign({}, figure, {layout: layout}), JSON.stringify(previous)];
+        },
+    },
+});
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy
+import pandas
+from decouple import config
+
+# Bump when a cached loader changes its output
+CACHE_VERSION = 4
+
+
+def cache_key(stage: str, paths: list, settings: dict) -> str:
+    """Build the cache key of a stage
+
+    Args:
+        stage (str): name of the stage
+        paths (list): input files of the stage, keyed by path, size and modification time
+        settings (dict): configuration values used by the stage
+
+    Returns:
+        str: hexadecimal key
+    """
+    files = []
+
+    for path in paths:
+        status = os.stat(path)
+        files.append([os.path.abspath(path), status.st_size, status.st_mtime_ns])
+
+    description = json.dumps(
+        {
+            "version": CACHE_VERSION,
+            "stage": stage,
+            "files": files,
+            "settings": settings,
+        },
+        sort_keys=True,
+        default=str,
+    )
+
+    return hashlib.sha256(description.encode("utf-8")).hexdigest()[:16]
+
+
+def store_dataframe(dataframe: pandas.DataFrame, path: str):
+    """Store a dataframe as one `.npy` file per column
+
+    Numeric and datetime columns are stored as is, other columns are stored as
+    integer codes with their categories. Categorical columns are loaded back as
+    categorical, the others as objects.
+
+    Args:
+        dataframe (pandas.DataFrame): dataframe to store
+        path (str): directory of the stored dataframe, replaced atomically
+    """
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    directory = tempfile.mkdtemp(dir=parent)
+    columns = []
+
+    for position, values in enumerate(
+        [dataframe.index.to_series()] + [column for _, column in dataframe.items()]
+    ):
+        file_name = str(position) + ".npy"
+        categorical = isinstance(values.dtype, pandas.CategoricalDtype)
+
+        if categorical:
+            codes, categories = values.cat.codes.to_numpy(), values.cat.categories
+        else:
+            values = values.to_numpy()
+
+            if values.dtype.kind in "biufcmM":
+                numpy.save(os.path.join(directory, file_name), values)
+                columns.append({"file": file_name})
+                continue
+
+            codes, categories = pandas.factorize(values)
+
+        numpy.save(os.path.join(directory, file_name), codes.astype(numpy.int32))
+        numpy.save(
+            os.path.join(directory, "categories-" + file_name),
+            numpy.asarray(categories, dtype=object),
+            allow_pickle=True,
+        )
+        columns.append(
+            {"file": file_name, "categories": True, "categorical": categorical}
+        )
+
+    with open(os.path.join(directory, "meta.json"), "w") as file:
+        json.dump(
+            {
+                "names": [str(name) for name in dataframe.columns],
+                "index_name": dataframe.index.name,
+                "columns": columns,
+            },
+            file,
+        )
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(directory, path)
+
+
+def load_dataframe(path: str) -> pandas.DataFrame:
+    """Load a dataframe stored by `store_dataframe`, numeric columns are memory-mapped
+
+    Args:
+        path (str): directory of the stored dataframe
+
+    Returns:
+        pandas.DataFrame: stored dataframe
+    """
+    with open(os.path.join(path, "meta.json")) as file:
+        meta = json.load(file)
+
+    arrays = []
+
+    for column in meta["columns"]:
+        values = numpy.load(os.path.join(path, column["file"]), mmap_mode="r")
+
+        if column.get("categories"):
+            categories = numpy.load(
+                os.path.join(path, "categories-" + column["file"]), allow_pickle=True
+            )
+
+            if column.get("categorical"):
+                values = pandas.Categorical.from_codes(values, categories)
+            else:
+                decoded = numpy.full(len(values), numpy.nan, dtype=object)
+                decoded[values >= 0] = categories[values[values >= 0]]
+                values = decoded
+
+        arrays.append(values)
+
+    index = pandas.Index(arrays[0], name=meta["index_name"])
+
+    return pandas.DataFrame(dict(zip(meta["names"], arrays[1:])), index=index)
+
+
+def cached_dataframe(
+    stage: str,
+    paths: list,
+    settings: dict,
+    build,
+    directory: str = None,
+    print_: bool = False,
+) -> pandas.DataFrame:
+    """Load the output of a stage from the cache, or build and store it
+
+    Args:
+        stage (str): name of the stage
+        paths (list): input files of the stage
+        settings (dict): configuration values used by the stage
+        build (callable): function building the dataframe on a cache miss
+        directory (str, optional): cache directory, an empty string disables the cache. Defaults to `config("CACHE_PATH")`.
+        print_ (bool, optional): Print cache hits and misses on console. Defaults to False.
+
+    Returns:
+        pandas.DataFrame: output of the stage
+    """
+    if directory is None:
+        directory = config("CACHE_PATH", default=".cache")
+
+    if not directory:
+        return build()
+
+    path = os.path.join(directory, stage + "-" + cache_key(stage, paths, settings))
+
+    if os.path.isfile(os.path.join(path, "meta.json")):
+        if print_:
+            print("cache hit:", path)
+
+        return load_dataframe(path)
+
+    if print_:
+        print("cache miss:", path)
+
+    dataframe = build()
+    store_dataframe(dataframe, path)
+
+    return dataframe
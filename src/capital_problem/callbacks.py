@@ -1,69 +1,191 @@
-import dash_core_components
 import dash_html_components
 import json
-from dash.dependencies import Input, Output
+import plotly.graph_objects
+from dash.dependencies import Input, Output, State, MATCH
+from dash.exceptions import PreventUpdate
+import dashboard
+import timing
 
 
 def zoom_in_dates_graph(
-    graph: dash_core_components.Graph, app, event, granularity: int
+    graph_id: str, app, event, granularity: int, clientside: bool = True
 ):
+    """Zoom on the dates around a selected point of a graph, select it again to unzoom
+
+    The callbacks only depend on the state sent by the browser, the zoom of a
+    session never changes the figure served to another one.
+
+    Args:
+        graph_id (str): id of the graph
+        app (dash.Dash): application of the report
+        event (str): graph property triggering the zoom
+        granularity (int): number of points displayed on each side of the selection
+        clientside (bool, optional): Update the axis range in the browser, the figure is never sent
+            back to the server. Defaults to True.
+    """
     # Store the previous state on the page
     app.layout.children.append(
         dash_html_components.Div(
-            id=graph.id + "-previous-state", style={"display": "none"}
+            id=graph_id + "-previous-state", style={"display": "none"}
         )
     )
 
+    if clientside:
+        # `zoom_in_dates` is defined in assets/callbacks.js
+        app.clientside_callback(
+            "function (clickData, previous_state, figure) {"
+            " return window.dash_clientside.zoom.zoom_in_dates("
+            "clickData, previous_state, figure, " + str(int(granularity)) + "); }",
+            Output(graph_id, "figure"),
+            Output(graph_id + "-previous-state", "children"),
+            Input(graph_id, event),
+            Input(graph_id + "-previous-state", "children"),
+            State(graph_id, "figure"),
+            prevent_initial_call=True,
+        )
+
+        return
+
     @app.callback(
-        Output(graph.id, "figure"),
-        Output(graph.id + "-previous-state", "children"),
-        Input(graph.id, event),
-        Input(graph.id + "-previous-state", "children"),
+        Output(graph_id, "figure"),
+        Output(graph_id + "-previous-state", "children"),
+        Input(graph_id, event),
+        Input(graph_id + "-previous-state", "children"),
+        State(graph_id, "figure"),
+        prevent_initial_call=True,
     )
-    def display_click_data(clickData, previous_state):
+    @timing.timed("callbacks.zoom_in_dates")
+    def display_click_data(clickData, previous_state, figure):
+        return zoom_in_dates(clickData, previous_state, figure, granularity)
 
-        previous = None
 
-        # Parse jsonify previous state
-        if previous_state:
-            previous = json.loads(previous_state)
+def zoom_in_dates(clickData, previous_state: str, figure: dict, granularity: int):
+    """Server-side twin of `zoom_in_dates` in assets/callbacks.js
+
+    Args:
+        clickData (dict): selected point, None when unselected
+        previous_state (str): json of the previous selection
+        figure (dict): figure displayed by the session, left untouched
+        granularity (int): number of points displayed on each side of the selection
+
+    Returns:
+        tuple: new figure and json of the selection
+    """
+    # Copy of the figure displayed by this session
+    figure = plotly.graph_objects.Figure(figure)
+    previous = None
+
+    # Parse jsonify previous state
+    if previous_state:
+        previous = json.loads(previous_state)
 
-        x_axis = graph.figure.data[0].x
+    x_axis = figure.data[0].x
 
-        if previous and previous == clickData or (previous and not clickData):
-            # Click on the same point or unselect : unzoom and reset previous state
-            graph.figure.update_layout(
+    if previous and previous == clickData or (previous and not clickData):
+        # Click on the same point or unselect : unzoom and reset previous state
+        figure.update_layout(
+            {
+                "margin": {"pad": 10},
+                "xaxis": {"range": [x_axis[0], x_axis[-1]]},
+            }
+        )
+        previous = None
+    else:
+        # Click on a point : update the range
+        if (
+            clickData
+            and clickData.get("points")
+            and clickData.get("points")[0].get("pointIndex")
+        ):
+            range_min = int(clickData.get("points")[0].get("pointIndex")) - granularity
+            range_max = (
+                int(clickData.get("points")[0].get("pointIndex"))
+                + granularity
+                - (range_min if range_min < 0 else 0)
+            )
+            range_min -= range_max if range_max > len(x_axis) else 0
+            range_min = range_min if range_min > 0 else 0
+            range_max = range_max if range_max < len(x_axis) else len(x_axis) - 1
+
+            figure.update_layout(
                 {
                     "margin": {"pad": 10},
-                    "xaxis": {"range": [x_axis[0], x_axis[-1]]},
+                    "xaxis": {"range": [x_axis[range_min], x_axis[range_max]]},
                 }
             )
-            previous = None
+        previous = clickData
+
+    return figure, json.dumps(previous)
+
+
+def refetch_large_graphs(app, get_series):
+    """Draw the visible window of the large graphs again at full resolution on zoom
+
+    The traces of `dashboard.build_large_time_series_chart` are downsampled over the
+    whole axis, zooming or panning draws the points of the new window only, from the
+    full resolution series kept by the server. The browser only sends the new axis
+    range.
+
+    Args:
+        app (dash.Dash): application of the report
+        get_series (callable): function returning the series of a large graph from its name,
+            None when unknown
+    """
+    graph = {"type": "large-graph", "index": MATCH}
+
+    @app.callback(
+        Output(graph, "figure"),
+        Input(graph, "relayoutData"),
+        State(graph, "id"),
+        prevent_initial_call=True,
+    )
+    @timing.timed("callbacks.refetch_large_graph")
+    def refetch_visible_window(relayout_data, graph_id):
+        if not relayout_data:
+            raise PreventUpdate
+
+        if "xaxis.range[0]" in relayout_data:
+            x_range = [relayout_data["xaxis.range[0]"], relayout_data["xaxis.range[1]"]]
+        elif "xaxis.range" in relayout_data:
+            x_range = relayout_data["xaxis.range"]
+        elif relayout_data.get("xaxis.autorange"):
+            x_range = None
         else:
-            # Click on a point : update the range
-            if (
-                clickData
-                and clickData.get("points")
-                and clickData.get("points")[0].get("pointIndex")
-            ):
-                range_min = (
-                    int(clickData.get("points")[0].get("pointIndex")) - granularity
-                )
-                range_max = (
-                    int(clickData.get("points")[0].get("pointIndex"))
-                    + granularity
-                    - (range_min if range_min < 0 else 0)
-                )
-                range_min -= range_max if range_max > len(x_axis) else 0
-                range_min = range_min if range_min > 0 else 0
-                range_max = range_max if range_max < len(x_axis) else len(x_axis) - 1
-
-                graph.figure.update_layout(
-                    {
-                        "margin": {"pad": 10},
-                        "xaxis": {"range": [x_axis[range_min], x_axis[range_max]]},
-                    }
-                )
-            previous = clickData
-
-        return graph.figure, json.dumps(previous)
+            raise PreventUpdate
+
+        series = get_series(graph_id["index"])
+
+        if not series:
+            raise PreventUpdate
+
+        return dashboard.get_window_figure(series, x_range)
+
+
+def page_explorer_table(table_id: str, get_explorer, app):
+    """Send the page of the data explorer table asked by the browser
+
+    Args:
+        table_id (str): id of the table built by `dashboard.build_explorer_table`
+        get_explorer (callable): function returning the `explorer.DataExplorer` of the table
+        app (dash.Dash): application of the report
+    """
+
+    @app.callback(
+        Output(table_id, "data"),
+        Output(table_id, "page_count"),
+        Output(table_id + "-row-count", "children"),
+        Input(table_id, "page_current"),
+        Input(table_id, "page_size"),
+        Input(table_id, "sort_by"),
+        Input(table_id, "filter_query"),
+    )
+    @timing.timed("callbacks.explorer_page")
+    def display_page(page_current, page_size, sort_by, filter_query):
+        records, page_count, row_count = get_explorer().page(
+            page_current=page_current or 0,
+            page_size=page_size,
+            sort_by=sort_by,
+            filter_query=filter_query,
+        )
+
+        return records, page_count, str(row_count) + " observations"
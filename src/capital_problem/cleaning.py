@@ -0,0 +1,194 @@
+import numpy
+import pandas
+
+# Rows handled at once by the rolling windows, bounds the memory of the `(rows, window)` arrays
+CHUNK_SIZE = 1 << 20
+
+
+def _rolling_windows(
+    values: numpy.ndarray, starts: numpy.ndarray, ends: numpy.ndarray, window: int
+):
+    """Centered windows of every row, never crossing the bounds of its series
+
+    Args:
+        values (numpy.ndarray): values of the series, one after the other
+        starts (numpy.ndarray): first index of the series of each row
+        ends (numpy.ndarray): last index of the series of each row
+        window (int): odd width of the windows
+
+    Yields:
+        tuple: `(rows, windows)` with `windows` of shape `(len(rows), window)`, `numpy.nan` outside
+        of the series
+    """
+    half = window // 2
+
+    for first in range(0, len(values), CHUNK_SIZE):
+        rows = numpy.arange(first, min(first + CHUNK_SIZE, len(values)))
+        positions = rows[:, None] + numpy.arange(-half, half + 1)
+        inside = (positions >= starts[rows, None]) & (positions <= ends[rows, None])
+        windows = values[numpy.clip(positions, 0, len(values) - 1)]
+        windows[~inside] = numpy.nan
+
+        yield rows, windows
+
+
+def _rolling_mean_outliers(values, starts, ends, window, threshold):
+    # Mean of complete windows only, completed from the nearest one of the series
+    means = numpy.full(len(values), numpy.nan)
+
+    for rows, windows in _rolling_windows(values, starts, ends, window):
+        means[rows] = windows.mean(axis=1)
+
+    means = _fill_in_series(means, starts, ends)
+
+    with numpy.errstate(invalid="ignore"):
+        return numpy.abs(values - means) > threshold
+
+
+def _hampel_outliers(values, starts, ends, window, threshold):
+    # Distance to the rolling median, in scaled median absolute deviations
+    outliers = numpy.zeros(len(values), dtype=bool)
+
+    for rows, windows in _rolling_windows(values, starts, ends, window):
+        present = ~numpy.isnan(windows)
+        medians = numpy.full(len(rows), numpy.nan)
+        deviations = numpy.full(len(rows), numpy.nan)
+
+        # numpy.nanmedian is much slower, it is only used on incomplete windows
+        for rows_kept, median in (
+            (present.all(axis=1), numpy.median),
+            (present.any(axis=1) & ~present.all(axis=1), numpy.nanmedian),
+        ):
+            medians[rows_kept] = median(windows[rows_kept], axis=1)
+            deviations[rows_kept] = 1.4826 * median(
+                numpy.abs(windows[rows_kept] - medians[rows_kept, None]), axis=1
+            )
+
+        with numpy.errstate(invalid="ignore"):
+            outliers[rows] = numpy.abs(values[rows] - medians) > threshold * deviations
+
+    return outliers
+
+
+# Outlier detection methods, by name
+METHODS = {
+    "rolling_mean": _rolling_mean_outliers,
+    "hampel": _hampel_outliers,
+}
+
+
+def _fill_in_series(
+    values: numpy.ndarray, starts: numpy.ndarray, ends: numpy.ndarray
+) -> numpy.ndarray:
+    """Fill missing values backward then forward, without crossing the bounds of the series"""
+    positions = numpy.arange(len(values))
+    present = ~numpy.isnan(values)
+
+    following = numpy.where(present, positions, len(values))
+    following = numpy.minimum.accumulate(following[::-1])[::-1]
+    preceding = numpy.where(present, positions, -1)
+    preceding = numpy.maximum.accumulate(preceding)
+
+    filled = values.copy()
+    backward = ~present & (following <= ends)
+    filled[backward] = values[following[backward]]
+    forward = numpy.isnan(filled) & (preceding >= starts)
+    filled[forward] = values[preceding[forward]]
+
+    return filled
+
+
+def _interpolate_in_series(
+    values: numpy.ndarray, starts: numpy.ndarray, ends: numpy.ndarray
+) -> numpy.ndarray:
+    """Linear interpolation of the missing values of each series, as `pandas.Series.interpolate`
+
+    Missing values after the last present value of a series take that value,
+    missing values before the first one stay missing.
+    """
+    positions = numpy.arange(len(values))
+    present = ~numpy.isnan(values)
+
+    following = numpy.where(present, positions, len(values))
+    following = numpy.minimum.accumulate(following[::-1])[::-1]
+    preceding = numpy.where(present, positions, -1)
+    preceding = numpy.maximum.accumulate(preceding)
+
+    interpolated = values.copy()
+    between = ~present & (preceding >= starts) & (following <= ends)
+    before, after = preceding[between], following[between]
+    interpolated[between] = values[before] + (values[after] - values[before]) * (
+        positions[between] - before
+    ) / (after - before)
+
+    last = ~present & (preceding >= starts) & (following > ends)
+    interpolated[last] = values[preceding[last]]
+
+    return interpolated
+
+
+def clean_outliers(
+    values: pandas.Series,
+    groups: pandas.Series = None,
+    method: str = "rolling_mean",
+    window: int = 5,
+    threshold: float = 10,
+) -> dict:
+    """Replace the outliers of one or many series by a linear interpolation, in one pass
+
+    The series are the rows of each group, in their order. Every missing value is
+    interpolated, outliers included.
+
+    Args:
+        values (pandas.Series): values of every series
+        groups (pandas.Series, optional): series of each row. Defaults to None (one series).
+        method (str, optional): name from `METHODS`, `rolling_mean` flags the values further than
+            `threshold` from the centered rolling mean, `hampel` the values further than
+            `threshold` scaled median absolute deviations from the centered rolling median.
+            Defaults to "rolling_mean".
+        window (int, optional): odd width of the rolling window. Defaults to 5.
+        threshold (float, optional): outlier threshold of the method. Defaults to 10.
+
+    Returns:
+        dict: `{"values": pandas.Series, "outliers": pandas.Series, "counts": pandas.Series}` cleaned
+        values and outlier flags on the index of `values`, and the number of outliers by group
+    """
+    if groups is None:
+        groups = pandas.Series(0, index=values.index)
+
+    codes, names = pandas.factorize(groups, sort=True)
+    order = numpy.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    sorted_values = pandas.to_numeric(values, errors="coerce").to_numpy(
+        dtype=numpy.float64
+    )[order]
+
+    # Bounds of the series of each row
+    bounds = numpy.flatnonzero(numpy.diff(sorted_codes)) + 1
+    firsts = numpy.concatenate([[0], bounds])
+    lasts = numpy.concatenate([bounds, [len(sorted_codes)]]) - 1
+    series = numpy.repeat(numpy.arange(len(firsts)), lasts - firsts + 1)
+    starts, ends = firsts[series], lasts[series]
+
+    sorted_outliers = METHODS[method](sorted_values, starts, ends, window, threshold)
+    sorted_values[sorted_outliers] = numpy.nan
+    sorted_values = _interpolate_in_series(sorted_values, starts, ends)
+
+    cleaned = numpy.empty_like(sorted_values)
+    cleaned[order] = sorted_values
+    outliers = numpy.empty(len(order), dtype=bool)
+    outliers[order] = sorted_outliers
+
+    dtype = values.dtype if values.dtype.kind == "f" else numpy.float64
+
+    return {
+        "values": pandas.Series(cleaned, index=values.index, name=values.name).astype(
+            dtype
+        ),
+        "outliers": pandas.Series(outliers, index=values.index, name=values.name),
+        "counts": pandas.Series(
+            numpy.bincount(codes[outliers & (codes >= 0)], minlength=len(names)),
+            index=pandas.Index(names, name=groups.name),
+            name="outliers",
+        ),
+    }
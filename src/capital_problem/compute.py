@@ -1,6 +1,215 @@
+import collections
+import collections.abc
+import concurrent.futures
+import functools
+import hashlib
+import os
+import tempfile
+import threading
+import time
 import pandas
 import numpy
 import similaritymeasures
+from decouple import config
+
+# Bump when a metric changes its output, the cached values are then ignored
+STATS_CACHE_VERSION = 1
+
+
+class StatsCache:
+    """Metric values memoized by content hash, in a bounded LRU and an optional directory
+
+    The directory is shared by every process using it, each value is one small file.
+
+    Args:
+        size (int, optional): number of values kept in memory. Defaults to 4096.
+        directory (str, optional): directory of the on-disk tier. Defaults to None (memory only).
+    """
+
+    def __init__(self, size: int = 4096, directory: str = None):
+        self.size = size
+        self.directory = directory
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        """Cached value of a key
+
+        Args:
+            key (str): key of the value
+
+        Returns:
+            float: the value, None on a miss
+        """
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+
+                return self.entries[key]
+
+        if self.directory:
+            try:
+                with open(self.path(key)) as file:
+                    value = float(file.read())
+            except (OSError, ValueError):
+                pass
+            else:
+                self.remember(key, value)
+
+                with self.lock:
+                    self.disk_hits += 1
+
+                return value
+
+        with self.lock:
+            self.misses += 1
+
+        return None
+
+    def set(self, key: str, value: float):
+        """Cache the value of a key
+
+        Args:
+            key (str): key of the value
+            value (float): value
+        """
+        self.remember(key, value)
+
+        if self.directory:
+            os.makedirs(os.path.dirname(self.path(key)), exist_ok=True)
+            descriptor, temporary_path = tempfile.mkstemp(dir=self.directory)
+
+            with os.fdopen(descriptor, "w") as file:
+                file.write(repr(float(value)))
+
+            os.replace(temporary_path, self.path(key))
+
+    def remember(self, key: str, value: float):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def counters(self) -> dict:
+        """Hits and misses since the cache creation
+
+        Returns:
+            dict: `{"hits": int, "disk_hits": int, "misses": int, "entries": int}`
+        """
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self.entries),
+            }
+
+
+@functools.lru_cache(maxsize=1)
+def get_stats_cache() -> StatsCache:
+    """Cache of the metrics of the process, configured by `STATS_CACHE_SIZE` and `STATS_CACHE_PATH`
+
+    Returns:
+        StatsCache: cache of the metrics, None when `STATS_CACHE_SIZE` is 0
+    """
+    size = int(config("STATS_CACHE_SIZE", default=4096))
+
+    if not size:
+        return None
+
+    return StatsCache(size, config("STATS_CACHE_PATH", default="") or None)
+
+
+def series_digest(*arrays: numpy.ndarray) -> str:
+    """Content hash of arrays, their shape and type included
+
+    Returns:
+        str: hexadecimal digest
+    """
+    digest = hashlib.sha256()
+
+    for array in arrays:
+        array = numpy.ascontiguousarray(array)
+        digest.update(repr((array.shape, array.dtype.str)).encode("utf-8"))
+        digest.update(array.tobytes())
+
+    return digest.hexdigest()
+
+
+class SimilarityStats(collections.abc.Mapping):
+    """Similarity metrics between two aligned series, each metric is computed on first access
+
+    Metrics are memoized by `get_stats_cache()`, keyed by the content of both series.
+    The durations of the metrics computed are kept in `durations`, they are sent back
+    with the stats by the worker processes.
+
+    Args:
+        values_1 (numpy.ndarray): `[days, values]` array of the series 1
+        values_2 (numpy.ndarray): `[days, values]` array of the series 2
+        window (int, optional): Sakoe-Chiba band width of the dtw in days. Defaults to 0 (lock-step).
+    """
+
+    def __init__(
+        self, values_1: numpy.ndarray, values_2: numpy.ndarray, window: int = 0
+    ):
+        self.values_1 = values_1
+        self.values_2 = values_2
+        self.window = window
+        self.computed = {}
+        self.durations = {}
+        self.digest = None
+
+    def compute(self, name: str) -> float:
+        started = time.perf_counter()
+        value = METRICS[name](self.values_1, self.values_2, self.window)
+        self.durations[name] = time.perf_counter() - started
+
+        return value
+
+    def __getitem__(self, name: str):
+        if name not in self.computed:
+            stats_cache = get_stats_cache()
+
+            if stats_cache is None:
+                self.computed[name] = self.compute(name)
+
+                return self.computed[name]
+
+            if self.digest is None:
+                self.digest = series_digest(self.values_1, self.values_2)
+
+            key = hashlib.sha256(
+                repr((STATS_CACHE_VERSION, self.digest, self.window, name)).encode(
+                    "utf-8"
+                )
+            ).hexdigest()
+            value = stats_cache.get(key)
+
+            if value is None:
+                value = self.compute(name)
+                stats_cache.set(key, value)
+
+            self.computed[name] = value
+
+        return self.computed[name]
+
+    def __iter__(self):
+        return iter(METRICS)
+
+    def __len__(self):
+        return len(METRICS)
+
+    def __repr__(self):
+        return "SimilarityStats(" + repr(self.computed) + ")"
 
 
 def stats_between_series(
@@ -9,7 +218,9 @@ def stats_between_series(
     xaxis_2: pandas.Series,
     values_2: pandas.Series,
     print_: bool = False,
-) -> dict:
+    window: int = 0,
+    metrics: tuple = None,
+) -> SimilarityStats:
     """Dynamic time warping and discret frechet distance for measuring similarity between two temporal sequences
 
     Args:
@@ -17,9 +228,11 @@ def stats_between_series(
         values_1 (pandas.Series): value axis of the dataframe 1
         xaxis_2 (pandas.Series): index axis of the dataframe 2
         values_2 (pandas.Series): value axis of the dataframe 2
+        window (int, optional): Sakoe-Chiba band width of the dtw in days, None for an unconstrained dtw. Defaults to 0 (lock-step).
+        metrics (tuple, optional): names from `METRICS` computed right away, the others are computed when read. Defaults to None (all).
 
     Returns:
-        dict: `{"dtw": float, "frechet_dist": float}`
+        SimilarityStats: mapping `{"dtw": float, "frechet_dist": float, "pcm": float, "area": float, "std": float}`
     """
 
     dataframe_1 = pandas.merge(xaxis_1, values_1, right_index=True, left_index=True)
@@ -53,38 +266,730 @@ def stats_between_series(
     dataframe_values_2 = numpy.array([xaxis_arranged, unified["values_2"].values])
     dataframe_values_1 = numpy.array([xaxis_arranged, unified["values_1"].values])
 
-    dtw, d = similaritymeasures.dtw(dataframe_values_1, dataframe_values_2)
+    stats = SimilarityStats(dataframe_values_1, dataframe_values_2, window)
+
+    for name in METRICS if metrics is None else metrics:
+        stats[name]
+
+    if print_:
+        print(stats, dataframe_values_2)
+
+    return stats
+
+
+def _dtw_metric(values_1: numpy.ndarray, values_2: numpy.ndarray, window: int = 0):
+    return dtw_one_to_many(values_1[1], values_2[1], window)[0]
+
+
+def _frechet_metric(values_1: numpy.ndarray, values_2: numpy.ndarray, window: int = 0):
+    return frechet_distance(values_1, values_2)
+
+
+def _pcm_metric(values_1: numpy.ndarray, values_2: numpy.ndarray, window: int = 0):
+    # Curves are (day, temperature) points, both on the same days
+    return partial_curve_mapping(values_1.T, values_2.T)
+
+
+def _area_metric(values_1: numpy.ndarray, values_2: numpy.ndarray, window: int = 0):
+    return area_between_curves(values_1.T, values_2.T)
+
+
+def _std_metric(values_1: numpy.ndarray, values_2: numpy.ndarray, window: int = 0):
+    return numpy.abs(numpy.nanstd(values_2[1]) - numpy.nanstd(values_1[1]))
 
-    frechet_dist = similaritymeasures.frechet_dist(
-        dataframe_values_1, dataframe_values_2
+
+# Metrics computed by `stats_between_series`, by name
+METRICS = {
+    "dtw": _dtw_metric,
+    "frechet_dist": _frechet_metric,
+    "pcm": _pcm_metric,
+    "area": _area_metric,
+    "std": _std_metric,
+}
+
+
+def stats_one_to_many(
+    xaxis_1: pandas.Series,
+    values_1: pandas.Series,
+    references: list,
+    window: int = 0,
+    workers: int = 1,
+    metrics: tuple = None,
+) -> list:
+    """`stats_between_series` between one series and many references
+
+    Args:
+        xaxis_1 (pandas.Series): index axis of the dataframe 1
+        values_1 (pandas.Series): value axis of the dataframe 1
+        references (list): `(xaxis, values)` tuples of the references
+        window (int, optional): Sakoe-Chiba band width of the dtw in days. Defaults to 0 (lock-step).
+        workers (int, optional): Number of processes, 1 runs in the current process and 0 uses every core. Defaults to 1.
+        metrics (tuple, optional): names from `METRICS` computed right away. Defaults to None (all).
+
+    Returns:
+        list: one `SimilarityStats` per reference, in the references order
+    """
+    stats = functools.partial(
+        stats_between_series,
+        xaxis_1=xaxis_1,
+        values_1=values_1,
+        window=window,
+        metrics=metrics,
     )
+    workers = workers or os.cpu_count()
+
+    if workers == 1 or len(references) < 2:
+        return [stats(xaxis_2=xaxis, values_2=values) for xaxis, values in references]
+
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=min(workers, len(references))
+    ) as executor:
+        futures = [
+            executor.submit(stats, xaxis_2=xaxis, values_2=values)
+            for xaxis, values in references
+        ]
+
+        return [future.result() for future in futures]
 
-    pcm = similaritymeasures.pcm(dataframe_values_1, dataframe_values_2)
 
-    area = similaritymeasures.area_between_two_curves(
-        dataframe_values_1, dataframe_values_2
+def align_on_axis(
+    axis: pandas.Series, xaxis: pandas.Series, values: pandas.Series
+) -> numpy.ndarray:
+    """Align a series on a reference axis the same way `stats_between_series` does
+
+    Missing values are linearly interpolated, then back and forward filled.
+
+    Args:
+        axis (pandas.Series): reference axis (usually the query's `full_date`)
+        xaxis (pandas.Series): index axis of the series to align
+        values (pandas.Series): value axis of the series to align
+
+    Returns:
+        numpy.ndarray: float64 values, one per element of `axis`
+    """
+
+    series = pandas.Series(
+        pandas.to_numeric(values, errors="coerce").values, index=xaxis.values
     )
+    series = series[~series.index.duplicated()]
 
-    std = numpy.abs(
-        numpy.nanstd(dataframe_values_2[1]) - numpy.nanstd(dataframe_values_1[1])
+    return (
+        series.reindex(axis.values)
+        .interpolate()
+        .fillna(method="bfill")
+        .fillna(method="ffill")
+        .to_numpy(dtype=numpy.float64)
     )
 
+
+# Diagonals swept between two early abandoning checks of `dtw_one_to_many`
+ABANDON_EVERY = 16
+
+
+def _anti_diagonals(n: int, m: int, window: int = None):
+    """Iterate over the anti-diagonals of a n×m alignment matrix
+
+    Every cell of diagonal `k` only depends on the diagonals `k - 1` and `k - 2`,
+    so a whole diagonal can be computed in one vectorized step.
+
+    Args:
+        n (int): number of rows
+        m (int): number of columns
+        window (int, optional): Sakoe-Chiba band, only cells with `|i - j| <= window` are yielded. Defaults to None (no band).
+
+    Yields:
+        tuple: `(k, rows)` where `rows` are the row indices of the diagonal `k`
+    """
+    for k in range(n + m - 1):
+        low, high = max(0, k - m + 1), min(n - 1, k)
+
+        if window is not None:
+            low, high = max(low, (k - window + 1) // 2), min(high, (k + window) // 2)
+
+        yield k, numpy.arange(low, high + 1)
+
+
+def dtw_one_to_many(
+    query: numpy.ndarray,
+    candidates: numpy.ndarray,
+    window: int = None,
+    threshold: float = numpy.inf,
+) -> numpy.ndarray:
+    """Dynamic time warping between one series and many series in one vectorized pass
+
+    The local cost is the squared difference and the accumulated cost is square
+    rooted, so the result equals
+    `sqrt(similaritymeasures.dtw(query[:, None], candidate[:, None], metric="sqeuclidean")[0])`
+    up to float64 rounding (relative error below 1e-9).
+
+    With `window=0` only the diagonal is allowed, which gives the lock-step euclidean
+    distance reported as `dtw` by `stats_between_series`.
+
+    The dynamic programming matrix is swept by anti-diagonals, all candidates at
+    once, keeping only the last two diagonals in memory. Only the cells of the
+    band are read and stored, so a diagonal costs `O(N × window)`. A candidate
+    whose partial cost already exceeds `threshold` is abandoned.
+
+    Args:
+        query (numpy.ndarray): query values, shape `(n,)`
+        candidates (numpy.ndarray): candidates values, shape `(N, m)`
+        window (int, optional): Sakoe-Chiba band width in days. Defaults to None (unconstrained).
+        threshold (float, optional): early abandoning distance. Defaults to `numpy.inf`.
+
+    Returns:
+        numpy.ndarray: dtw distances, shape `(N,)`, `numpy.inf` for abandoned candidates
+    """
+    query = numpy.asarray(query, dtype=numpy.float64)
+    candidates = numpy.atleast_2d(numpy.asarray(candidates, dtype=numpy.float64))
+    n, m = len(query), candidates.shape[1]
+    distances = numpy.full(len(candidates), numpy.inf)
+
+    # The band never reaches the last cell
+    if window is not None and abs(n - m) > window:
+        return distances
+
+    # Lock-step: only the diagonal is allowed
+    if window == 0 and n == m:
+        distances = numpy.sqrt(((candidates - query) ** 2).sum(axis=1))
+        distances[distances > threshold] = numpy.inf
+
+        return distances
+
+    active = numpy.arange(len(candidates))
+    squared_threshold = threshold**2
+
+    # A diagonal holds at most `window + 1` cells of the band. Position `p` of the
+    # buffer of a diagonal starting at row `low` stands for the row `low + p - 1`,
+    # position 0 and the positions after the diagonal stay infinite (out of band)
+    width = min(n, m, n if window is None else window + 1) + 2
+    previous_2 = numpy.full((len(active), width), numpy.inf)
+    previous_1 = numpy.full((len(active), width), numpy.inf)
+    low_2 = low_1 = 0
+
+    for k, rows in _anti_diagonals(n, m, window):
+        low, size = rows[0], len(rows)
+
+        values = candidates[:, k - rows]
+        current = numpy.full((len(active), width), numpy.inf)
+
+        if k == 0:
+            current[:, 1 : size + 1] = (values - query[rows]) ** 2
+        else:
+            # Cells (row - 1, col) and (row, col - 1) on the previous diagonal,
+            # (row - 1, col - 1) on the one before
+            start_1, start_2 = low - low_1, low - low_2
+            current[:, 1 : size + 1] = (values - query[rows]) ** 2 + numpy.minimum(
+                numpy.minimum(
+                    previous_1[:, start_1 : start_1 + size],
+                    previous_1[:, start_1 + 1 : start_1 + size + 1],
+                ),
+                previous_2[:, start_2 : start_2 + size],
+            )
+
+        previous_2, previous_1 = previous_1, current
+        low_2, low_1 = low_1, low
+
+        # Every warping path goes through one of the last two diagonals, checked
+        # every few diagonals as small arrays cost more in calls than in cells
+        if squared_threshold < numpy.inf and k % ABANDON_EVERY == 1:
+            frontier = numpy.minimum(previous_1.min(axis=1), previous_2.min(axis=1))
+            kept = frontier <= squared_threshold
+
+            if not kept.all():
+                active, candidates = active[kept], candidates[kept]
+                previous_2, previous_1 = previous_2[kept], previous_1[kept]
+
+                if not len(active):
+                    break
+
+    # The last diagonal is the single cell (n - 1, m - 1)
+    distances[active] = numpy.sqrt(previous_1[:, 1])
+    distances[distances > threshold] = numpy.inf
+
+    return distances
+
+
+def frechet_distance(curve_1: numpy.ndarray, curve_2: numpy.ndarray) -> float:
+    """Discrete frechet distance in linear memory
+
+    Same result as `similaritymeasures.frechet_dist(curve_1, curve_2)`, but the
+    coupling matrix is swept by anti-diagonals and only the last three are kept.
+
+    Args:
+        curve_1 (numpy.ndarray): points of the first curve, shape `(n, dimensions)`
+        curve_2 (numpy.ndarray): points of the second curve, shape `(m, dimensions)`
+
+    Returns:
+        float: discrete frechet distance
+    """
+    curve_1 = numpy.asarray(curve_1, dtype=numpy.float64)
+    curve_2 = numpy.asarray(curve_2, dtype=numpy.float64)
+    n, m = len(curve_1), len(curve_2)
+
+    # Diagonals are indexed by row + 1, position 0 stands for the row -1 (out of matrix)
+    previous_2 = numpy.full(n + 1, numpy.inf)
+    previous_1 = numpy.full(n + 1, numpy.inf)
+
+    for k, rows in _anti_diagonals(n, m):
+        cost = numpy.linalg.norm(curve_1[rows] - curve_2[k - rows], axis=1)
+        current = numpy.full(n + 1, numpy.inf)
+
+        if k == 0:
+            current[rows + 1] = cost
+        else:
+            current[rows + 1] = numpy.maximum(
+                cost,
+                numpy.minimum(
+                    numpy.minimum(previous_1[rows], previous_1[rows + 1]),
+                    previous_2[rows],
+                ),
+            )
+
+        previous_2, previous_1 = previous_1, current
+
+    return float(previous_1[n])
+
+
+def frechet_within(
+    curve_1: numpy.ndarray, curve_2: numpy.ndarray, epsilon: float
+) -> bool:
+    """Decide if the discrete frechet distance between two curves is at most `epsilon`
+
+    The sweep stops as soon as no coupling within `epsilon` can go further, so
+    far away curves are rejected after a few anti-diagonals.
+
+    Args:
+        curve_1 (numpy.ndarray): points of the first curve, shape `(n, dimensions)`
+        curve_2 (numpy.ndarray): points of the second curve, shape `(m, dimensions)`
+        epsilon (float): distance to test
+
+    Returns:
+        bool: `frechet_distance(curve_1, curve_2) <= epsilon`
+    """
+    curve_1 = numpy.asarray(curve_1, dtype=numpy.float64)
+    curve_2 = numpy.asarray(curve_2, dtype=numpy.float64)
+    n, m = len(curve_1), len(curve_2)
+
+    # Both ends are always coupled
+    if (
+        numpy.linalg.norm(curve_1[0] - curve_2[0]) > epsilon
+        or numpy.linalg.norm(curve_1[-1] - curve_2[-1]) > epsilon
+    ):
+        return False
+
+    previous_2 = numpy.zeros(n + 1, dtype=bool)
+    previous_1 = numpy.zeros(n + 1, dtype=bool)
+
+    for k, rows in _anti_diagonals(n, m):
+        close = numpy.linalg.norm(curve_1[rows] - curve_2[k - rows], axis=1) <= epsilon
+        current = numpy.zeros(n + 1, dtype=bool)
+
+        if k == 0:
+            current[rows + 1] = close
+        else:
+            current[rows + 1] = close & (
+                previous_1[rows] | previous_1[rows + 1] | previous_2[rows]
+            )
+
+        if not current.any() and not previous_1.any():
+            return False
+
+        previous_2, previous_1 = previous_1, current
+
+    return bool(previous_1[n])
+
+
+def frechet_top_k(query: numpy.ndarray, candidates: list, k: int, print_: bool = False):
+    """Find the `k` candidate curves with the lowest discrete frechet distance
+
+    Both ends of two curves are always coupled, so the farthest end is a lower
+    bound of the distance. Candidates are visited by increasing lower bound, once
+    `k` distances are known a candidate is only computed when `frechet_within`
+    accepts it below the current k-th best distance, far away curves are rejected
+    after a few anti-diagonals.
+
+    Args:
+        query (numpy.ndarray): points of the query curve, shape `(n, dimensions)`
+        candidates (list): points of the candidate curves, shapes `(m, dimensions)`
+        k (int): number of candidates to keep
+        print_ (bool, optional): Print the pruning ratio on console. Defaults to False.
+
+    Returns:
+        tuple: `(indices, distances)` of the best candidates sorted by distance
+    """
+    query = numpy.asarray(query, dtype=numpy.float64)
+    bounds = numpy.array(
+        [
+            max(
+                numpy.linalg.norm(query[0] - candidate[0]),
+                numpy.linalg.norm(query[-1] - candidate[-1]),
+            )
+            for candidate in candidates
+        ]
+    )
+    best_indices, best_distances = [], []
+    computed = 0
+
+    for index in numpy.argsort(bounds, kind="stable"):
+        if len(best_distances) >= k:
+            kth = best_distances[k - 1]
+
+            if bounds[index] > kth:
+                break
+
+            if not frechet_within(query, candidates[index], kth):
+                continue
+
+        computed += 1
+        distance = frechet_distance(query, candidates[index])
+        position = numpy.searchsorted(best_distances, distance, side="right")
+        best_indices.insert(position, int(index))
+        best_distances.insert(position, distance)
+        del best_indices[k:], best_distances[k:]
+
+    if print_:
+        print("frechet top", k, ":", computed, "/", len(candidates), "computed")
+
+    return numpy.array(best_indices, dtype=int), numpy.array(best_distances)
+
+
+def area_between_curves(curve_1: numpy.ndarray, curve_2: numpy.ndarray) -> float:
+    """Area between two curves
+
+    When both curves share their x coordinates, `similaritymeasures` quadrilaterals
+    are trapezoids of height `|y_1 - y_2|`, so the area is computed in one
+    vectorized step. Other curves go through `similaritymeasures.area_between_two_curves`.
+
+    Args:
+        curve_1 (numpy.ndarray): points of the first curve, shape `(n, 2)`
+        curve_2 (numpy.ndarray): points of the second curve, shape `(m, 2)`
+
+    Returns:
+        float: area between the curves
+    """
+    curve_1 = numpy.asarray(curve_1, dtype=numpy.float64)
+    curve_2 = numpy.asarray(curve_2, dtype=numpy.float64)
+
+    if curve_1.shape != curve_2.shape or not numpy.array_equal(
+        curve_1[:, 0], curve_2[:, 0]
+    ):
+        return similaritymeasures.area_between_two_curves(curve_1, curve_2)
+
+    gaps = numpy.abs(curve_1[:, 1] - curve_2[:, 1])
+
+    return float(numpy.sum(numpy.diff(curve_1[:, 0]) * (gaps[:-1] + gaps[1:]) / 2))
+
+
+def _arc_lengths(x: numpy.ndarray, y: numpy.ndarray) -> tuple:
+    """Cumulative arc lengths of a curve
+
+    Args:
+        x (numpy.ndarray): x coordinates
+        y (numpy.ndarray): y coordinates
+
+    Returns:
+        tuple: `(total, cumulative)` arc lengths, `cumulative` starts at 0
+    """
+    cumulative = numpy.concatenate(
+        [[0.0], numpy.cumsum(numpy.hypot(numpy.diff(x), numpy.diff(y)))]
+    )
+
+    return cumulative[-1], cumulative
+
+
+def partial_curve_mapping(curve_1: numpy.ndarray, curve_2: numpy.ndarray) -> float:
+    """Partial curve mapping between two curves
+
+    Same result as `similaritymeasures.pcm(curve_1, curve_2)`: arc lengths are
+    computed with `numpy.diff` and the 200 offsets are interpolated at once.
+
+    Args:
+        curve_1 (numpy.ndarray): points of the first curve, shape `(n, 2)`
+        curve_2 (numpy.ndarray): points of the second curve, shape `(m, 2)`
+
+    Returns:
+        float: partial curve mapping
+    """
+    curve_1 = numpy.asarray(curve_1, dtype=numpy.float64)
+    curve_2 = numpy.asarray(curve_2, dtype=numpy.float64)
+
+    # Normalize both curves on the first one
+    minimum, maximum = curve_1.min(axis=0), curve_1.max(axis=0)
+    normalized_1 = (curve_1 - minimum) / (maximum - minimum)
+    normalized_2 = (curve_2 - minimum) / (maximum - minimum)
+
+    length_1, cumulative_1 = _arc_lengths(normalized_1[:, 0], normalized_1[:, 1])
+    length_2, cumulative_2 = _arc_lengths(normalized_2[:, 0], normalized_2[:, 1])
+
+    # The first curve has to be the longest
+    if length_2 > length_1:
+        normalized_1, normalized_2 = normalized_2, normalized_1
+        length_1, length_2 = length_2, length_1
+        cumulative_1, cumulative_2 = cumulative_2, cumulative_1
+
+    cumulative_1, cumulative_2 = cumulative_1 / length_1, cumulative_2 / length_2
+
+    offsets = (
+        numpy.zeros(1)
+        if length_1 == length_2
+        else numpy.linspace(0.0, length_1 - length_2, 200)
+    )
+    positions = cumulative_1 + offsets[:, None]
+
+    distances = numpy.hypot(
+        normalized_1[:, 0] - numpy.interp(positions, cumulative_2, normalized_2[:, 0]),
+        normalized_1[:, 1] - numpy.interp(positions, cumulative_2, normalized_2[:, 1]),
+    )
+
+    return float(
+        numpy.min(
+            numpy.sum(
+                (distances[:, :-1] + distances[:, 1:]) / 2 * cumulative_1[1:], axis=1
+            )
+        )
+    )
+
+
+def sliding_distances(
+    query: numpy.ndarray, series: numpy.ndarray, normalize: bool = False
+) -> numpy.ndarray:
+    """Euclidean distance between a query and every subsequence of a long series (MASS)
+
+    The sliding dot products come from one FFT convolution, so the whole
+    distance profile costs O(n log n) instead of O(n × m). Without
+    normalization, the distance is the lock-step `dtw` of `stats_between_series`.
+
+    Args:
+        query (numpy.ndarray): query values, shape `(m,)`
+        series (numpy.ndarray): long series without missing values, shape `(n,)` with `n >= m`
+        normalize (bool, optional): compare z-normalized subsequences. Defaults to False.
+
+    Returns:
+        numpy.ndarray: distance of the subsequence starting at each offset, shape `(n - m + 1,)`
+    """
+    query = numpy.asarray(query, dtype=numpy.float64)
+    series = numpy.asarray(series, dtype=numpy.float64)
+    m, n = len(query), len(series)
+
+    size = 1 << (n + m - 1).bit_length()
+    products = numpy.fft.irfft(
+        numpy.fft.rfft(series, size) * numpy.fft.rfft(query[::-1], size), size
+    )[m - 1 : n]
+
+    cumulative = numpy.concatenate([[0.0], numpy.cumsum(series)])
+    cumulative_squares = numpy.concatenate([[0.0], numpy.cumsum(series**2)])
+    sums = cumulative[m:] - cumulative[:-m]
+    squares = cumulative_squares[m:] - cumulative_squares[:-m]
+
+    if normalize:
+        means = sums / m
+        stds = numpy.sqrt(numpy.clip(squares / m - means**2, 0, None))
+        correlations = (products - m * means * query.mean()) / (
+            m * numpy.where(stds > 0, stds, numpy.inf) * query.std()
+        )
+        distances = 2 * m * (1 - correlations)
+    else:
+        distances = squares - 2 * products + numpy.sum(query**2)
+
+    return numpy.sqrt(numpy.clip(distances, 0, None))
+
+
+def best_offsets(distances: numpy.ndarray, k: int, exclusion: int) -> numpy.ndarray:
+    """Offsets of the `k` lowest distances, at least `exclusion` apart from each other
+
+    Args:
+        distances (numpy.ndarray): distance profile of `sliding_distances`
+        k (int): number of offsets
+        exclusion (int): minimum gap between two offsets
+
+    Returns:
+        numpy.ndarray: offsets sorted by distance
+    """
+    offsets = []
+
+    for offset in numpy.argsort(distances, kind="stable"):
+        if all(abs(offset - kept) >= exclusion for kept in offsets):
+            offsets.append(offset)
+
+            if len(offsets) == k:
+                break
+
+    return numpy.array(offsets, dtype=int)
+
+
+def lb_kim(query: numpy.ndarray, candidates: numpy.ndarray) -> numpy.ndarray:
+    """LB_Kim lower bound of `dtw_one_to_many`, first and last points are always matched
+
+    Args:
+        query (numpy.ndarray): query values, shape `(n,)`
+        candidates (numpy.ndarray): candidates values, shape `(N, m)`
+
+    Returns:
+        numpy.ndarray: lower bounds, shape `(N,)`
+    """
+    query = numpy.asarray(query, dtype=numpy.float64)
+    candidates = numpy.atleast_2d(numpy.asarray(candidates, dtype=numpy.float64))
+
+    bound = (candidates[:, 0] - query[0]) ** 2
+
+    if len(query) > 1 or candidates.shape[1] > 1:
+        bound += (candidates[:, -1] - query[-1]) ** 2
+
+    return numpy.sqrt(bound)
+
+
+def lb_keogh(
+    query: numpy.ndarray, candidates: numpy.ndarray, window: int = None
+) -> numpy.ndarray:
+    """LB_Keogh lower bound of `dtw_one_to_many` for series of the same length
+
+    Each candidate point is compared to the envelope of the query over the band.
+
+    Args:
+        query (numpy.ndarray): query values, shape `(n,)`
+        candidates (numpy.ndarray): candidates values, shape `(N, n)`
+        window (int, optional): Sakoe-Chiba band width in days. Defaults to None (unconstrained).
+
+    Returns:
+        numpy.ndarray: lower bounds, shape `(N,)`
+    """
+    query = numpy.asarray(query, dtype=numpy.float64)
+    candidates = numpy.atleast_2d(numpy.asarray(candidates, dtype=numpy.float64))
+
+    if candidates.shape[1] != len(query):
+        raise ValueError("LB_Keogh needs candidates with the query's length")
+
+    window = len(query) if window is None else min(window, len(query))
+    padded = numpy.pad(query, window, mode="edge")
+    bands = numpy.lib.stride_tricks.sliding_window_view(padded, 2 * window + 1)
+    upper, lower = bands.max(axis=1), bands.min(axis=1)
+
+    over = numpy.clip(candidates - upper, 0, None)
+    under = numpy.clip(lower - candidates, 0, None)
+
+    return numpy.sqrt((over**2 + under**2).sum(axis=1))
+
+
+def dtw_top_k(
+    query: numpy.ndarray,
+    candidates: numpy.ndarray,
+    k: int,
+    window: int = None,
+    batch_size: int = 16,
+    print_: bool = False,
+) -> tuple:
+    """Find the `k` candidates with the lowest dtw without computing all of them
+
+    Candidates are visited by increasing lower bound (LB_Kim, then LB_Keogh when
+    lengths match). A candidate whose lower bound can't beat the current k-th
+    best distance is skipped, the others run `dtw_one_to_many` with early
+    abandoning on the k-th best distance.
+
+    Each sweep of `dtw_one_to_many` costs the same Python overhead whatever its
+    number of candidates, so the k-th best distance is bounded first and all the
+    candidates left run in one sweep. With the query's length, the lock-step
+    distance follows a path of every band and bounds it for free. Otherwise the
+    `batch_size` candidates with the lowest bounds run in a first sweep.
+
+    Args:
+        query (numpy.ndarray): query values, shape `(n,)`
+        candidates (numpy.ndarray): candidates values, shape `(N, m)`
+        k (int): number of candidates to keep
+        window (int, optional): Sakoe-Chiba band width in days. Defaults to None (unconstrained).
+        batch_size (int, optional): candidates of the first sweep, at least `k`. Defaults to 16.
+        print_ (bool, optional): Print the pruning ratio on console. Defaults to False.
+
+    Returns:
+        tuple: `(indices, distances)` of the best candidates sorted by distance
+    """
+    candidates = numpy.atleast_2d(numpy.asarray(candidates, dtype=numpy.float64))
+    bounds = lb_kim(query, candidates)
+
+    if candidates.shape[1] == len(query):
+        bounds = numpy.maximum(bounds, lb_keogh(query, candidates, window))
+
+    order = numpy.argsort(bounds, kind="stable")
+
+    if candidates.shape[1] == len(query):
+        first, rest = order[:0], order
+        best_distances = numpy.array([])
+        upper = numpy.sort(dtw_one_to_many(query, candidates, window=0))
+        kth = upper[k - 1] if len(upper) >= k else numpy.inf
+    else:
+        first, rest = numpy.split(order, [max(batch_size, k)])
+        best_distances = dtw_one_to_many(query, candidates[first], window)
+        kth = numpy.sort(best_distances)[k - 1] if len(first) >= k else numpy.inf
+
+    best_indices = first
+    computed = len(first)
+
+    rest = rest[bounds[rest] <= kth]
+
+    if len(rest):
+        best_indices = numpy.concatenate([best_indices, rest])
+        best_distances = numpy.concatenate(
+            [best_distances, dtw_one_to_many(query, candidates[rest], window, kth)]
+        )
+        computed += len(rest)
+
+    ranking = numpy.argsort(best_distances, kind="stable")[:k]
+    best_indices, best_distances = best_indices[ranking], best_distances[ranking]
+
     if print_:
-        print(
-            {
-                "dtw": dtw,
-                "frechet_dist": frechet_dist,
-                "pcm": pcm,
-                "area": area,
-                "std": std,
-            },
-            dataframe_values_2,
+        print("dtw top", k, ":", computed, "/", len(candidates), "computed")
+
+    return best_indices, best_distances
+
+
+def lttb(x: numpy.ndarray, y: numpy.ndarray, threshold: int) -> numpy.ndarray:
+    """Indices of the points kept by Largest-Triangle-Three-Buckets downsampling
+
+    The first and last points are kept, every other point is taken from its bucket
+    as the one forming the largest triangle with the previous kept point and the
+    average of the next bucket.
+
+    Args:
+        x (numpy.ndarray): sorted x values, datetimes are compared as integers
+        y (numpy.ndarray): y values, missing values are never kept over present ones
+        threshold (int): number of points kept
+
+    Returns:
+        numpy.ndarray: sorted indices of the kept points
+    """
+    x = numpy.asarray(x)
+
+    if x.dtype.kind == "M":
+        x = x.astype("datetime64[ns]").astype(numpy.int64)
+
+    x = x.astype(numpy.float64)
+    y = numpy.asarray(y, dtype=numpy.float64)
+    size = len(x)
+
+    if threshold >= size or threshold < 3:
+        return numpy.arange(size)
+
+    # threshold - 2 buckets between the first and the last point
+    edges = numpy.linspace(1, size - 1, threshold - 1).astype(numpy.int64)
+    indices = numpy.empty(threshold, dtype=numpy.int64)
+    indices[0], indices[-1] = 0, size - 1
+    previous = 0
+
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+
+        if bucket + 2 < len(edges):
+            next_x = x[stop : edges[bucket + 2]].mean()
+            next_values = y[stop : edges[bucket + 2]]
+            next_values = next_values[~numpy.isnan(next_values)]
+            next_y = next_values.mean() if len(next_values) else y[previous]
+        else:
+            next_x, next_y = x[-1], y[-1]
+
+        areas = numpy.abs(
+            (x[previous] - next_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (next_y - y[previous])
         )
+        previous = start + numpy.argmax(numpy.nan_to_num(areas, nan=-1.0))
+        indices[bucket + 1] = previous
 
-    return {
-        "dtw": dtw,
-        "frechet_dist": frechet_dist,
-        "pcm": pcm,
-        "area": area,
-        "std": std,
-    }
+    return indices
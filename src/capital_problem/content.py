@@ -3,14 +3,35 @@ import pandas
 from decouple import config
 from pandas.io.parsers import read_csv
 from pandas.io.sql import DatabaseError
+import cache
+import cleaning
 import dashboard
+import store
 import summary
-import datetime
+import timing
 import numpy
+import os
 import compute
 import sys
 
-
+# Month names, only used for display
+MONTH_NAMES = (
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+)
+
+
+@timing.timed("content.melt")
 def get_stacked_temperatures(dataframe: pandas.DataFrame, print_: bool = False):
     """Stack temperatures stored in multiple columns with days represented by rows
 
@@ -19,43 +40,120 @@ def get_stacked_temperatures(dataframe: pandas.DataFrame, print_: bool = False):
         print_ (bool, optional): Print param to print the dataframe. Defaults to False.
 
     Returns:
-        pandas.DataFrame: dataframe with temperatures stacked, a column for days and a column for months
+        pandas.DataFrame: dataframe with temperatures stacked, a column for days and a column for month numbers
     """
+    months = {
+        dataframe.columns[index]: month
+        for month, index in enumerate(
+            map(int, str(config("MONTH_COLUMNS")).split(",")), start=1
+        )
+    }
 
     # Stack temperature
     only_temperature = pandas.melt(
         dataframe,
         id_vars=[dataframe.columns[0]],
-        value_vars=[
-            dataframe.columns[index]
-            for index in list(map(int, str(config("MONTH_COLUMNS")).split(",")))
-        ],
+        value_vars=list(months),
         var_name="Month",
         value_name="Temperature",
     )
-
-    if print_:
-        print("stack\n", only_temperature)
+    only_temperature["Month"] = only_temperature["Month"].map(months).astype("int16")
 
     return only_temperature
 
 
+class ClimateWorkbook:
+    """Climate workbook session, the file is opened once on the first parsed sheet
+
+    Args:
+        path (str, optional): path of the workbook. Defaults to `config("CLIMATE_PATH")`.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or config("CLIMATE_PATH")
+        self.excel_file = None
+
+    def parse(self, sheet_name: str, **kwargs) -> pandas.DataFrame:
+        if self.excel_file is None:
+            self.excel_file = pandas.ExcelFile(self.path)
+
+        with timing.span("content.xlsx_parse"):
+            return pandas.read_excel(self.excel_file, sheet_name=sheet_name, **kwargs)
+
+    def sheets(self, sheet_names: list, print_: bool = False):
+        """Yield the reference spreadsheets of each requested sheet
+
+        Args:
+            sheet_names (list): names of the sheets
+            print_ (bool, optional): Print param to print the dataframes. Defaults to False.
+
+        Yields:
+            pandas.DataFrame: Reference spreadsheets
+        """
+        for sheet_name in sheet_names:
+            yield get_reference_spreadsheets(sheet_name, print_=print_, workbook=self)
+
+    def close(self):
+        if self.excel_file is not None:
+            self.excel_file.close()
+            self.excel_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
 def get_reference_spreadsheets(
-    sheet_name: str, print_: bool = False
+    sheet_name: str, print_: bool = False, workbook: ClimateWorkbook = None
 ) -> pandas.DataFrame:
     """Get the reference spreadsheets
 
     Args:
         sheet_name (str, required) : Name of the sheet where to extract data.
         print_ (bool, optional): Print param to print the dataframe. Defaults to False.
+        workbook (ClimateWorkbook, optional): opened climate workbook. Defaults to None (opened for this sheet only).
+
+    Returns:
+        pandas.DataFrame: Reference spreadsheets
+    """
+    if workbook is None:
+        with ClimateWorkbook() as workbook:
+            return get_reference_spreadsheets(sheet_name, print_, workbook)
+
+    reference_spreadsheets = cache.cached_dataframe(
+        stage="reference",
+        paths=[workbook.path],
+        settings={
+            "sheet_name": sheet_name,
+            "CLIMATE_HEADER": config("CLIMATE_HEADER"),
+            "CLIMATE_COL_RANGE": config("CLIMATE_COL_RANGE"),
+            "DAY_COL_INDEX": config("DAY_COL_INDEX"),
+            "MONTH_COLUMNS": config("MONTH_COLUMNS"),
+        },
+        build=lambda: read_reference_spreadsheets(sheet_name, workbook),
+        print_=print_,
+    )
+
+    return reference_spreadsheets
+
+
+def read_reference_spreadsheets(
+    sheet_name: str, workbook: ClimateWorkbook
+) -> pandas.DataFrame:
+    """Parse the reference spreadsheets from the climate workbook
+
+    Args:
+        sheet_name (str, required) : Name of the sheet where to extract data.
+        workbook (ClimateWorkbook, required): climate workbook
 
     Returns:
         pandas.DataFrame: Reference spreadsheets
     """
 
     # Import XLSX
-    reference_spreadsheets: pandas.DataFrame = pandas.read_excel(
-        io=config("CLIMATE_PATH"),
+    reference_spreadsheets: pandas.DataFrame = workbook.parse(
         sheet_name=sheet_name,
         skiprows=int(config("CLIMATE_HEADER")) - 1,
         usecols=config("CLIMATE_COL_RANGE"),
@@ -69,22 +167,15 @@ def get_reference_spreadsheets(
         == True
     ]
 
-    # Put a trailling zero
-    def pad_number(match):
-        number = int(match.group(1))
-        return format(number, "02d")
-
+    # Keep the day number
     reference_spreadsheets[
         reference_spreadsheets.columns[int(config("DAY_COL_INDEX"))]
-    ] = reference_spreadsheets[
-        reference_spreadsheets.columns[int(config("DAY_COL_INDEX"))]
-    ].str.replace(
-        r"^J([0-9]+)$", pad_number
-    )
-
-    # Replace month name by month locale's full name
-    reference_spreadsheets.columns = header_month_convertor(
-        reference_spreadsheets.columns.values
+    ] = (
+        reference_spreadsheets[
+            reference_spreadsheets.columns[int(config("DAY_COL_INDEX"))]
+        ]
+        .str.extract(r"^J([0-9]+)$", expand=False)
+        .astype("int16")
     )
 
     # Rename day column
@@ -92,53 +183,85 @@ def get_reference_spreadsheets(
         reference_spreadsheets.columns.values, "Day", int(config("DAY_COL_INDEX"))
     )
 
-    if print_:
-        print(reference_spreadsheets)
-
     return reference_spreadsheets
 
 
 def get_all_capitals_spreadsheets(print_: bool = False) -> list:
+    """Get the cleaned temperatures of the capitals
 
-    columns = str(config("ALL_CAPITALS_SPREADSHEETS_COLUMNS")).split(",")
-    all_capitals_spreadsheets: pandas.DataFrame = pandas.read_csv(
-        config("ALL_CAPITALS_SPREADSHEETS"),
-        delimiter=",",
-        usecols=columns,
-    )
+    Args:
+        print_ (bool, optional): Print param to print the dataframe. Defaults to False.
 
-    # Rename columns
-    all_capitals_spreadsheets.rename(
-        columns={
-            columns[0]: "Year",
-            columns[1]: "Month",
-            columns[2]: "Day",
-            columns[3]: "Temperature",
-            columns[4]: "Capital",
-            columns[5]: "Region",
+    Returns:
+        list: `(pandas.DataFrame, str)` tuples of temperatures and capital name, sorted by name
+    """
+    store_path = get_references_store_path()
+    all_capitals_spreadsheets = cache.cached_dataframe(
+        stage="capitals",
+        paths=[
+            os.path.join(store_path, "index.json")
+            if store_path
+            else config("ALL_CAPITALS_SPREADSHEETS")
+        ],
+        settings={
+            "ALL_CAPITALS_SPREADSHEETS_COLUMNS": config(
+                "ALL_CAPITALS_SPREADSHEETS_COLUMNS"
+            ),
+            "filters": get_references_filters(),
+            "outliers": get_outliers_settings(),
         },
-        inplace=True,
+        build=lambda: read_all_capitals_spreadsheets(print_=print_),
+        print_=print_,
     )
 
-    # Filter on 2018
-    all_capitals_spreadsheets = all_capitals_spreadsheets[
-        all_capitals_spreadsheets["Year"] == 2018
-    ]
-
-    # Filter on Europe
-    all_capitals_spreadsheets = all_capitals_spreadsheets[
-        all_capitals_spreadsheets["Region"] == "Europe"
-    ]
-    # Filter on Capitals
-    all_capitals_spreadsheets = all_capitals_spreadsheets[
-        all_capitals_spreadsheets["Capital"].isin(
-            str(config("CAPITALS_LIST")).split(";")
+    return [
+        (spreadsheet.reset_index(drop=True), name)
+        for name, spreadsheet in all_capitals_spreadsheets.groupby(
+            "Capital", observed=True
         )
     ]
 
-    # Rename month
-    all_capitals_spreadsheets["Month"] = all_capitals_spreadsheets["Month"].apply(
-        lambda x: datetime.date(1900, x, 1).strftime("%B")
+
+def read_all_capitals_spreadsheets(
+    print_: bool = False, filters: dict = None
+) -> pandas.DataFrame:
+    """Parse and clean the capitals temperatures from the Kaggle dataset
+
+    Args:
+        print_ (bool, optional): Print param to print the outliers. Defaults to False.
+        filters (dict, optional): allowed values of `Year`, `Region` and `Capital`. Defaults to `get_references_filters()`.
+
+    Returns:
+        pandas.DataFrame: temperatures in °C of every capital
+    """
+    if filters is None:
+        filters = get_references_filters()
+
+    columns = str(config("ALL_CAPITALS_SPREADSHEETS_COLUMNS")).split(",")
+    names = ["Year", "Month", "Day", "Temperature", "Capital", "Region"]
+
+    # Filter on years, regions and capitals while reading
+    if get_references_store_path():
+        all_capitals_spreadsheets = read_store_spreadsheets(
+            temperature_store=store.TemperatureStore(get_references_store_path()),
+            filters=filters,
+        )
+    else:
+        with timing.span("content.csv_read"):
+            all_capitals_spreadsheets = store.read_filtered_csv(
+                path=config("ALL_CAPITALS_SPREADSHEETS"),
+                columns=dict(zip(columns, names)),
+                dtypes=dict(
+                    zip(
+                        columns,
+                        ["int16", "int16", "int16", "float32", "category", "category"],
+                    )
+                ),
+                filters=filters,
+                chunksize=int(config("CSV_CHUNK_SIZE", default=500000)),
+            )
+    all_capitals_spreadsheets = all_capitals_spreadsheets.astype(
+        {"Capital": "category", "Region": "category"}
     )
 
     # Remove duplicates
@@ -151,53 +274,174 @@ def get_all_capitals_spreadsheets(print_: bool = False) -> list:
         all_capitals_spreadsheets["Temperature"] <= -99, "Temperature"
     ] = numpy.nan
 
-    # Split Dataframe on cities
-    def map_dataframe(tuple_: tuple):
-        # Remove outliers
-        tuple_[1]["Temperature"] = remove_outliers(tuple_[1], "Temperature")
+    # Remove outliers of every capital at once, in °F
+    with timing.span("cleaning.outliers"):
+        cleaned = cleaning.clean_outliers(
+            all_capitals_spreadsheets["Temperature"],
+            groups=all_capitals_spreadsheets["Capital"],
+            **get_outliers_settings(),
+        )
+
+    if print_:
+        print("outliers: ", cleaned["counts"][cleaned["counts"] > 0])
+
+    # Transform temperatures from °F to °C
+    all_capitals_spreadsheets["Temperature"] = (cleaned["values"] - 32) * 5 / 9
+
+    return all_capitals_spreadsheets.sort_values(
+        "Capital", kind="stable", ignore_index=True
+    )
 
-        # Transform temperatures from °F to °C
-        tuple_[1]["Temperature"] = (tuple_[1]["Temperature"] - 32) * 5 / 9
 
-        # Reset fuckedup index
-        tuple_[1].reset_index(inplace=True)
+def get_explorer_spreadsheet(print_: bool = False) -> pandas.DataFrame:
+    """Get the cleaned temperatures of every city and year of the Kaggle dataset
 
-        return (tuple_[1], tuple_[0])
+    Args:
+        print_ (bool, optional): Print cache hits and misses on console. Defaults to False.
+
+    Returns:
+        pandas.DataFrame: `Capital`, `Region`, `Date` and `Temperature` in °C, sorted by city and date
+    """
+    store_path = get_references_store_path()
+
+    def read_explorer_spreadsheet():
+        spreadsheet = read_all_capitals_spreadsheets(print_=False, filters={})
+        spreadsheet["Date"] = create_date_column(
+            spreadsheet["Year"], spreadsheet["Month"], spreadsheet["Day"]
+        )
 
-    spreadsheets = list(
-        map(
-            map_dataframe,
-            list(all_capitals_spreadsheets.groupby("Capital")),
+        return (
+            spreadsheet[["Capital", "Region", "Date", "Temperature"]]
+            .sort_values(["Capital", "Date"], kind="stable")
+            .reset_index(drop=True)
         )
+
+    return cache.cached_dataframe(
+        stage="explorer",
+        paths=[
+            os.path.join(store_path, "index.json")
+            if store_path
+            else config("ALL_CAPITALS_SPREADSHEETS")
+        ],
+        settings={
+            "ALL_CAPITALS_SPREADSHEETS_COLUMNS": config(
+                "ALL_CAPITALS_SPREADSHEETS_COLUMNS"
+            ),
+            "outliers": get_outliers_settings(),
+        },
+        build=read_explorer_spreadsheet,
+        print_=print_,
     )
 
-    return spreadsheets
 
+def get_list_setting(name: str, default: str = "", cast=str):
+    """Get a `;` separated list from the configuration
 
-def remove_outliers(
-    dataframe: pandas.DataFrame, column_outlier_name: str, print_: bool = False
-) -> pandas.Series:
-    # Detects outliers
-    dataframe["mean"] = (
-        dataframe[column_outlier_name]
-        .rolling(window=5, center=True)
-        .mean()
-        .fillna(method="bfill")
-        .fillna(method="ffill")
-    )
+    Args:
+        name (str): name of the setting
+        default (str, optional): default value. Defaults to "".
+        cast (callable, optional): cast of each element. Defaults to str.
 
-    threshold = 10
-    difference = numpy.abs(dataframe[column_outlier_name] - dataframe["mean"])
-    outliers = difference > threshold
+    Returns:
+        list: elements of the list, None when the setting is empty
+    """
+    value = str(config(name, default=default)).strip()
 
-    if print_:
-        print("outliers: ", dataframe[outliers][[column_outlier_name, "mean"]])
+    return [cast(element) for element in value.split(";")] if value else None
+
+
+def get_references_filters() -> dict:
+    """Get the filters of the references dataset from the configuration
+
+    Returns:
+        dict: allowed values by column, columns without filter are skipped
+    """
+    filters = {
+        "Year": get_list_setting("REFERENCES_YEARS", default="2018", cast=int),
+        "Region": get_list_setting("REFERENCES_REGIONS", default="Europe"),
+        "Capital": get_list_setting("CAPITALS_LIST"),
+    }
+
+    return {column: values for column, values in filters.items() if values}
+
+
+def get_references_store_path():
+    """Get the path of the references temperature store, when it has been ingested
+
+    Returns:
+        str: directory of the store, None to read the csv
+    """
+    path = str(config("REFERENCES_STORE", default=""))
+
+    return path if path and os.path.isfile(os.path.join(path, "index.json")) else None
+
+
+@timing.timed("content.store_read")
+def read_store_spreadsheets(
+    temperature_store: store.TemperatureStore, filters: dict
+) -> pandas.DataFrame:
+    """Read the references from the temperature store, with the csv columns
 
-    if not outliers.empty:
-        dataframe.loc[outliers, column_outlier_name] = numpy.nan
-        dataframe[column_outlier_name] = dataframe[column_outlier_name].interpolate()
+    Args:
+        temperature_store (store.TemperatureStore): ingested temperature store
+        filters (dict): allowed values of `Year`, `Region` and `Capital`
+
+    Returns:
+        pandas.DataFrame: filtered rows with the columns and dtypes of `store.read_filtered_csv`,
+        empty when no city nor year matches
+    """
+    dtypes = {
+        "Year": "int16",
+        "Month": "int16",
+        "Day": "int16",
+        "Temperature": "float32",
+        "Capital": "category",
+        "Region": "category",
+    }
+    frames = []
+
+    for name in temperature_store.cities:
+        region = temperature_store.city(name)["region"]
+
+        if name not in filters.get("Capital", [name]) or region not in filters.get(
+            "Region", [region]
+        ):
+            continue
+
+        for year in filters.get("Year", [None]):
+            dates, temperatures = temperature_store.temperatures(name, year, year)
+            frames.append(
+                pandas.DataFrame(
+                    {
+                        "Year": dates.year,
+                        "Month": dates.month,
+                        "Day": dates.day,
+                        "Temperature": temperatures,
+                        "Capital": name,
+                        "Region": region,
+                    }
+                )
+            )
+
+    if not frames:
+        return pandas.DataFrame(
+            {column: pandas.Series(dtype=dtype) for column, dtype in dtypes.items()}
+        )
+
+    return pandas.concat(frames, ignore_index=True).astype(dtypes)
 
-    return dataframe[column_outlier_name]
+
+def get_outliers_settings() -> dict:
+    """Get the outlier cleaning settings
+
+    Returns:
+        dict: `method`, `window` and `threshold` parameters of `cleaning.clean_outliers`
+    """
+    return {
+        "method": str(config("OUTLIERS_METHOD", default="rolling_mean")),
+        "window": int(config("OUTLIERS_WINDOW", default=5)),
+        "threshold": float(config("OUTLIERS_THRESHOLD", default=10)),
+    }
 
 
 def get_alternate_spreadsheets(print_: bool = False) -> pandas.DataFrame:
@@ -210,10 +454,31 @@ def get_alternate_spreadsheets(print_: bool = False) -> pandas.DataFrame:
         list: Reference spreadsheets
     """
     reference: list = str(config("SPREADSHEET_SAVUKOSKI")).split(";")
-    spreadsheet: pandas.DataFrame = pandas.read_excel(
-        io=reference[1], sheet_name=reference[2]
+    spreadsheet = cache.cached_dataframe(
+        stage="alternate",
+        paths=[reference[1]],
+        settings={"SPREADSHEET_SAVUKOSKI": config("SPREADSHEET_SAVUKOSKI")},
+        build=lambda: read_alternate_spreadsheets(reference),
+        print_=print_,
     )
 
+    return (spreadsheet, reference[0])
+
+
+def read_alternate_spreadsheets(reference: list) -> pandas.DataFrame:
+    """Parse the altenate spreadsheets
+
+    Args:
+        reference (list): `SPREADSHEET_SAVUKOSKI` setting, split on `;`
+
+    Returns:
+        pandas.DataFrame: Alternate spreadsheets
+    """
+    with timing.span("content.xlsx_parse"):
+        spreadsheet: pandas.DataFrame = pandas.read_excel(
+            io=reference[1], sheet_name=reference[2]
+        )
+
     spreadsheet = spreadsheet.rename(
         columns={
             reference[3]: "Month",
@@ -222,76 +487,143 @@ def get_alternate_spreadsheets(print_: bool = False) -> pandas.DataFrame:
         }
     )
 
-    spreadsheet["Month"] = spreadsheet["Month"].apply(
-        lambda x: datetime.date(1900, x, 1).strftime("%B")
-    )
-
-    if print_:
-        print(spreadsheet)
-
-    return (spreadsheet, reference[0])
+    return spreadsheet
 
 
-def header_month_convertor(header_list: list):
-    """Convert header month to locale's full name
+def header_column_rename(header_list: list, column_name: str, column_index: int):
+    """Rename column with a name
 
     Args:
         header_list (list, required): header list param to convert the month.
+        column_name (str, required): New name for the column
+        column_index (int, required): index of the column
 
     Returns:
         pandas.DataFrame: header list
     """
-    for key, month_index in enumerate(
-        list(map(int, str(config("MONTH_COLUMNS")).split(","))), start=1
-    ):
-        header_list[month_index] = datetime.date(1900, key, 1).strftime("%B")
+    header_list[column_index] = column_name
 
     return header_list
 
 
-def header_column_rename(header_list: list, column_name: str, column_index: int):
-    """Rename column with a name
+@timing.timed("content.dates")
+def create_date_column(year: pandas.Series, month: pandas.Series, day: pandas.Series):
+    """Create dates from year, month and day numbers
 
     Args:
-        header_list (list, required): header list param to convert the month.
-        column_name (str, required): New name for the column
-        column_index (int, required): index of the column
+        year (pandas.Series): years
+        month (pandas.Series): month numbers
+        day (pandas.Series): day numbers
 
     Returns:
-        pandas.DataFrame: header list
+        pandas.Series: dates, `NaT` where the day does not exist
     """
-    header_list[column_index] = column_name
+    return store.assemble_dates(year, month, day)
 
-    return header_list
 
+def get_dtw_window():
+    """Get the dtw Sakoe-Chiba band from the configuration
 
-def create_date_column(year: pandas.Series, month: pandas.Series, day: pandas.Series):
-    return pandas.to_datetime(
-        year.astype(str) + "-" + month.astype(str) + "-" + day.astype(str),
-        format="%Y-%B-%d",
-        errors="coerce",
-    )
+    Returns:
+        int: band width in days, None for an unconstrained dtw
+    """
+    window = str(config("DTW_WINDOW", default="0"))
+
+    return None if window.lower() == "none" else int(window)
+
+
+# Metrics used by the references score
+SCORE_METRICS = ("dtw", "pcm", "std")
+
+
+def observe_metric_durations(all_stats: list):
+    """Record the durations of the similarity metrics computed since the last call
+
+    Args:
+        all_stats (list): `compute.SimilarityStats`, their durations are then cleared
+    """
+    for stats in all_stats:
+        for name, seconds in stats.durations.items():
+            timing.get_stage_timings().observe("compute." + name, seconds)
+
+        stats.durations.clear()
 
 
 def get_references_statistics(stacked_temperatures: dict, print_: bool = False):
     spreadsheets = get_all_capitals_spreadsheets(print_=print_)
+    window = get_dtw_window()
+    shortlist = int(config("REFERENCES_SHORTLIST", default=0))
+
+    # Only score the capitals with the best dtw or frechet distance, the others are
+    # pruned on lower bounds
+    if 0 < shortlist < len(spreadsheets):
+        query = compute.align_on_axis(
+            stacked_temperatures[0]["full_date"],
+            stacked_temperatures[0]["full_date"],
+            stacked_temperatures[0]["Temperature"],
+        )
+        candidates = numpy.array(
+            [
+                compute.align_on_axis(
+                    stacked_temperatures[0]["full_date"],
+                    create_date_column(
+                        spreadsheet["Year"], spreadsheet["Month"], spreadsheet["Day"]
+                    ),
+                    spreadsheet["Temperature"],
+                )
+                for spreadsheet, name in spreadsheets
+            ]
+        )
+        if str(config("REFERENCES_SHORTLIST_METRIC", default="dtw")) == "frechet_dist":
+            days = numpy.arange(len(query))
+            indices, _ = compute.frechet_top_k(
+                numpy.column_stack([days, query]),
+                [numpy.column_stack([days, candidate]) for candidate in candidates],
+                k=shortlist,
+                print_=print_,
+            )
+        else:
+            indices, _ = compute.dtw_top_k(
+                query, candidates, k=shortlist, window=window, print_=print_
+            )
+        spreadsheets = [spreadsheets[index] for index in indices]
+
     dtw_low, dtw_high = 0, -sys.maxsize - 1
-    frechet_dist_low, frechet_dist_high = 0, -sys.maxsize - 1
     pcm_low, pcm_high = 0, -sys.maxsize - 1
-    area_low, area_high = 0, -sys.maxsize - 1
     std_low, std_high = 0, -sys.maxsize - 1
     references = []
 
-    for key, packed_spreadsheet in enumerate(spreadsheets, start=0):
-
-        spreadsheet = packed_spreadsheet[0]
-        name = packed_spreadsheet[1]
-
+    for spreadsheet, name in spreadsheets:
         spreadsheet["full_date"] = create_date_column(
             spreadsheet["Year"],
             spreadsheet["Month"],
             spreadsheet["Day"],
         )
+
+    # Metrics are computed first (in parallel when configured), figures stay in this process
+    with timing.span("compute.references"):
+        all_stats_between_series = compute.stats_one_to_many(
+            xaxis_1=stacked_temperatures[0]["full_date"],
+            values_1=stacked_temperatures[0]["Temperature"],
+            references=[
+                (spreadsheet["full_date"], spreadsheet["Temperature"])
+                for spreadsheet, name in spreadsheets
+            ],
+            window=window,
+            workers=int(config("REFERENCES_WORKERS", default=1)),
+            metrics=SCORE_METRICS,
+        )
+
+    observe_metric_durations(all_stats_between_series)
+
+    if print_ and compute.get_stats_cache():
+        print("stats cache :", compute.get_stats_cache().counters())
+
+    for key, packed_spreadsheet in enumerate(spreadsheets, start=0):
+
+        spreadsheet = packed_spreadsheet[0]
+        name = packed_spreadsheet[1]
+
         display_dataframe: pandas.DataFrame = pandas.concat(
             [
                 spreadsheet["full_date"],
@@ -304,26 +636,14 @@ def get_references_statistics(stacked_temperatures: dict, print_: bool = False):
 
         display_dataframe.columns = ["full_date", "SI", "SI-Erreur", name]
 
-        stats_between_series = compute.stats_between_series(
-            xaxis_1=stacked_temperatures[0]["full_date"],
-            values_1=stacked_temperatures[0]["Temperature"],
-            xaxis_2=spreadsheet["full_date"],
-            values_2=spreadsheet["Temperature"],
-        )
+        stats_between_series = all_stats_between_series[key]
 
         dtw_low, dtw_high = min(stats_between_series.get("dtw"), dtw_low), max(
             dtw_high, stats_between_series.get("dtw")
         )
-        frechet_dist_low, frechet_dist_high = (
-            min(stats_between_series.get("frechet_dist"), frechet_dist_low),
-            max(frechet_dist_high, stats_between_series.get("frechet_dist")),
-        )
         pcm_low, pcm_high = min(stats_between_series.get("pcm"), pcm_low), max(
             pcm_high, stats_between_series.get("pcm")
         )
-        area_low, area_high = min(stats_between_series.get("area"), area_low), max(
-            area_high, stats_between_series.get("area")
-        )
         std_low, std_high = min(stats_between_series.get("std"), std_low), max(
             std_high, stats_between_series.get("std")
         )
@@ -370,6 +690,14 @@ def get_references_statistics(stacked_temperatures: dict, print_: bool = False):
             / float(std_low - std_high)
         )
 
+        if print_:
+            print("dataframe", reference.get("name"), ":", reference.get("score", 0))
+
+    references.sort(key=lambda k: k["score"])
+    references = references[:5]
+
+    # Metrics outside of the score are only computed for the displayed capitals
+    for key, reference in enumerate(references, start=0):
         reference["comparision_summary"] = dashboard.build_card_group(
             {
                 **dict(reference.get("stats_between_series")),
@@ -378,11 +706,11 @@ def get_references_statistics(stacked_temperatures: dict, print_: bool = False):
             "comparision-summary-references-" + str(key),
         )
 
-        if print_:
-            print("dataframe", reference.get("name"), ":", reference.get("score", 0))
+    observe_metric_durations(
+        [reference["stats_between_series"] for reference in references]
+    )
 
-    references.sort(key=lambda k: k["score"])
-    return references[:5]
+    return references
 
 
 def get_savukoski_statistics(stacked_temperatures: dict, print_: bool = False):
@@ -413,7 +741,9 @@ def get_savukoski_statistics(stacked_temperatures: dict, print_: bool = False):
         values_1=stacked_temperatures[0]["Temperature"],
         xaxis_2=spreadsheet["full_date"],
         values_2=spreadsheet["Temperature"],
+        window=get_dtw_window(),
     )
+    observe_metric_durations([stats_between_series])
 
     visual_alternate_annual_graph = dashboard.build_time_series_chart(
         id="annual-graph-savukoski",
@@ -501,7 +831,9 @@ def get_statistics_dtw_proof(stacked_temperatures: dict, print_: bool = False):
         values_1=stacked_temperatures[0]["Temperature"],
         xaxis_2=stacked_temperatures[1]["full_date"],
         values_2=stacked_temperatures[1]["Temperature"],
+        window=get_dtw_window(),
     )
+    observe_metric_durations([stats_between_series])
 
     visual_alternate_annual_graph = dashboard.build_time_series_chart(
         id="annual-graph-dtw-proof",
@@ -558,10 +890,12 @@ def get_statistics_dtw_proof(stacked_temperatures: dict, print_: bool = False):
     }
 
 
-def get_statistics(sheet_name: str, print_: bool = False):
+def get_statistics(
+    sheet_name: str, print_: bool = False, workbook: ClimateWorkbook = None
+):
     # Get reference spreadsheets
     reference_spreadsheets = get_reference_spreadsheets(
-        print_=print_, sheet_name=sheet_name
+        print_=print_, sheet_name=sheet_name, workbook=workbook
     )
 
     display_sheet_name = sheet_name.replace(" ", "").lower()
@@ -589,42 +923,36 @@ def get_statistics(sheet_name: str, print_: bool = False):
         stacked_temperatures["Temperature"], errors="coerce", downcast="float"
     ).interpolate()
 
-    # Detects outliers
-    sk_temp = stacked_temperatures
-
-    sk_temp["mean"] = (
-        stacked_temperatures["Temperature"]
-        .rolling(window=5, center=True)
-        .mean()
-        .fillna(method="bfill")
-        .fillna(method="ffill")
-    )
-
-    threshold = 10
-    difference = numpy.abs(sk_temp["Temperature"] - sk_temp["mean"])
-    outliers = difference > threshold
+    # Remove outliers
+    with timing.span("cleaning.outliers"):
+        cleaned = cleaning.clean_outliers(
+            stacked_temperatures["Temperature"], **get_outliers_settings()
+        )
 
     if print_:
-        print("outliers: ", sk_temp[outliers][["full_date", "Temperature", "mean"]])
+        print(
+            "outliers: ",
+            stacked_temperatures[cleaned["outliers"]][["full_date", "Temperature"]],
+        )
 
-    if not outliers.empty:
-        stacked_temperatures.loc[outliers, "Temperature"] = numpy.nan
-        stacked_temperatures["Temperature"] = stacked_temperatures[
-            "Temperature"
-        ].interpolate()
+    stacked_temperatures["Temperature"] = cleaned["values"]
 
     # Unstack data
     months = stacked_temperatures["Month"].unique()
 
-    spreadsheet_for_summary = stacked_temperatures[
-        ["Day", "Month", "Temperature"]
-    ].pivot(index=["Day"], columns="Month")
+    with timing.span("content.pivot"):
+        spreadsheet_for_summary = stacked_temperatures[
+            ["Day", "Month", "Temperature"]
+        ].pivot(index=["Day"], columns="Month")
 
     spreadsheet_for_summary.columns = (
         spreadsheet_for_summary.columns.droplevel().rename(None)
     )
 
-    spreadsheet_for_summary = spreadsheet_for_summary.reindex(months, axis=1)
+    # Months are named for display only
+    spreadsheet_for_summary = spreadsheet_for_summary.reindex(months, axis=1).rename(
+        columns=lambda month: MONTH_NAMES[month - 1]
+    )
 
     spreadsheet_for_summary.reset_index(level=0, inplace=True)
 
@@ -1,47 +1,70 @@
+import argparse
+import gc
+import os
+import sys
 import dash_html_components
 from decouple import config
+import artifact
 import dashboard
 import callbacks
-import content
+import timing
 
+# Settings the content of the report depends on, an artifact built with other values is stale
+REPORT_SETTINGS = (
+    "CLIMATE_PATH",
+    "CLIMATE_SHEET_SI",
+    "CLIMATE_SHEET_SI_ERROR",
+    "CLIMATE_COL_RANGE",
+    "CLIMATE_HEADER",
+    "DAY_COL_INDEX",
+    "MONTH_COLUMNS",
+    "SPREADSHEET_SAVUKOSKI",
+    "ALL_CAPITALS_SPREADSHEETS",
+    "ALL_CAPITALS_SPREADSHEETS_COLUMNS",
+    "REFERENCES_YEARS",
+    "REFERENCES_REGIONS",
+    "CAPITALS_LIST",
+    "REFERENCES_STORE",
+    "OUTLIERS_METHOD",
+    "OUTLIERS_WINDOW",
+    "OUTLIERS_THRESHOLD",
+    "DTW_WINDOW",
+    "REFERENCES_SHORTLIST",
+    "REFERENCES_SHORTLIST_METRIC",
+    "CHART_MAX_POINTS",
+)
 
-def run(debug: bool = bool(int(config("DEBUG")))):
-    """core main run
+
+def build_statistics_tab(stats: dict) -> list:
+    """Components of the tab of a climate sheet
 
     Args:
-        debug (bool, optional): Parameter to run on debug. Defaults to `bool(int(config("DEBUG")))`.
+        stats (dict): output of `content.get_statistics`
+
+    Returns:
+        list: dash components
     """
-    stats_SI = content.get_statistics(
-        sheet_name=config("CLIMATE_SHEET_SI"), print_=debug
-    )
-    stats_SI_ERRORS = content.get_statistics(
-        sheet_name=config("CLIMATE_SHEET_SI_ERROR"), print_=debug
-    )
+    return [
+        stats["year_summary"],
+        stats["month_summary"],
+        stats["monthly_graph"],
+        stats["annual_graph"],
+    ]
 
-    dtw_proof = content.get_statistics_dtw_proof(
-        stacked_temperatures=[
-            stats_SI["stacked_temperatures"],
-            stats_SI_ERRORS["stacked_temperatures"],
-        ],
-        print_=debug,
-    )
 
-    stats_similarities = content.get_savukoski_statistics(
-        stacked_temperatures=[
-            stats_SI["stacked_temperatures"],
-            stats_SI_ERRORS["stacked_temperatures"],
-        ],
-        print_=debug,
-    )
+def build_resolution_tab(
+    dtw_proof: dict, stats_similarities: dict, stats_resolution: list
+) -> list:
+    """Components of the resolution tab
 
-    stats_resolution = content.get_references_statistics(
-        stacked_temperatures=[
-            stats_SI["stacked_temperatures"],
-            stats_SI_ERRORS["stacked_temperatures"],
-        ],
-        print_=debug,
-    )
+    Args:
+        dtw_proof (dict): output of `content.get_statistics_dtw_proof`
+        stats_similarities (dict): output of `content.get_savukoski_statistics`
+        stats_resolution (list): output of `content.get_references_statistics`
 
+    Returns:
+        list: dash components
+    """
     stats_resolution_divs = []
 
     if stats_resolution:
@@ -75,20 +98,8 @@ def run(debug: bool = bool(int(config("DEBUG")))):
             )
         )
 
-    report = dashboard.build_app_report(
-        si_dash_components_list=[
-            stats_SI["year_summary"],
-            stats_SI["month_summary"],
-            stats_SI["monthly_graph"],
-            stats_SI["annual_graph"],
-        ],
-        si_error_dash_components_list=[
-            stats_SI_ERRORS["year_summary"],
-            stats_SI_ERRORS["month_summary"],
-            stats_SI_ERRORS["monthly_graph"],
-            stats_SI_ERRORS["annual_graph"],
-        ],
-        alternate_dash_components_list=[
+    return (
+        [
             dtw_proof["visual_header"],
             dtw_proof["similarities"],
             dtw_proof["annual_graph"],
@@ -100,22 +111,294 @@ def run(debug: bool = bool(int(config("DEBUG")))):
             stats_similarities["annual_graph"],
             stats_similarities["comparision_summary"],
         ]
-        + stats_resolution_divs,
+        + stats_resolution_divs
+    )
+
+
+def get_annual_graph_ids() -> dict:
+    """Ids of the annual graphs of the climate sheets
+
+    Returns:
+        dict: `{"SI": str, "SI_ERRORS": str}`
+    """
+    return {
+        sheet_key: "annual-graph-" + sheet_name.replace(" ", "").lower()
+        for sheet_key, sheet_name in (
+            ("SI", config("CLIMATE_SHEET_SI")),
+            ("SI_ERRORS", config("CLIMATE_SHEET_SI_ERROR")),
+        )
+    }
+
+
+def build_explorer_tab() -> list:
+    """Components of the data explorer tab
+
+    Returns:
+        list: dash components
+    """
+    return [
+        dash_html_components.H2(
+            "Cleaned temperatures of every city", className="visuals"
+        ),
+        dash_html_components.P(id="explorer-table-row-count", className="visuals"),
+        dashboard.build_explorer_table(
+            columns=["Capital", "Region", "Date", "Temperature"], id="explorer-table"
+        ),
+    ]
+
+
+def build_report(tabs: list, warm_stages, get_explorer=None, get_series=None):
+    """Build the dash application and its callbacks
+
+    Args:
+        tabs (list): components of the three tabs, lists or functions building them
+        warm_stages (callable): function returning the computed stages as `{stage: bool}`
+        get_explorer (callable, optional): function returning the `explorer.DataExplorer` of the
+            data explorer tab. Defaults to None (no data explorer).
+        get_series (callable, optional): function returning the series of a large graph from its
+            name. Defaults to None (the series built by this process).
+
+    Returns:
+        dash.Dash: application of the report
+    """
+    report = dashboard.build_app_report(
+        si_dash_components_list=tabs[0],
+        si_error_dash_components_list=tabs[1],
+        alternate_dash_components_list=tabs[2],
+        warm_stages=warm_stages,
+        explorer_dash_components_list=build_explorer_tab if get_explorer else None,
+    )
+
+    if get_explorer:
+        callbacks.page_explorer_table(
+            table_id="explorer-table", get_explorer=get_explorer, app=report
+        )
+
+    for graph_id in get_annual_graph_ids().values():
+        callbacks.zoom_in_dates_graph(
+            graph_id=graph_id,
+            app=report,
+            event="selectedData",
+            granularity=15,
+        )
+
+    callbacks.refetch_large_graphs(
+        app=report, get_series=get_series or dashboard.LARGE_GRAPH_SERIES.get
+    )
+
+    return report
+
+
+def build_report_from_pipeline(print_: bool = False, preload: bool = False):
+    """Build the report computing each tab the first time it is displayed
+
+    Args:
+        print_ (bool, optional): Print the timings of the stages on console. Defaults to False.
+        preload (bool, optional): Compute every stage now instead. Defaults to False.
+
+    Returns:
+        dash.Dash: application of the report
+    """
+    # Only imported when the statistics are computed, it brings pandas along
+    import pipeline
+
+    report_pipeline = pipeline.Pipeline(print_=print_)
+
+    if preload:
+        for stage in report_pipeline.stages:
+            report_pipeline.get(stage)
+
+    tabs = [
+        lambda: build_statistics_tab(report_pipeline.get("statistics")["SI"]),
+        lambda: build_statistics_tab(report_pipeline.get("statistics")["SI_ERRORS"]),
+        lambda: build_resolution_tab(
+            report_pipeline.get("dtw_proof"),
+            report_pipeline.get("savukoski"),
+            report_pipeline.get("references"),
+        ),
+    ]
+
+    def get_series(name: str):
+        # Graph displayed from another worker, its stages are computed in this one
+        if name not in dashboard.LARGE_GRAPH_SERIES:
+            for tab in tabs:
+                tab()
+
+        return dashboard.LARGE_GRAPH_SERIES.get(name)
+
+    return build_report(
+        tabs=tabs,
+        warm_stages=report_pipeline.warm,
+        get_explorer=lambda: report_pipeline.get("explorer"),
+        get_series=get_series,
+    )
+
+
+def get_report_sources() -> dict:
+    """Get the input files and settings of the report, as recorded in its artifact
+
+    Returns:
+        dict: sources from `artifact.get_sources`
+    """
+    store_path = str(config("REFERENCES_STORE", default=""))
+    store_index = os.path.join(store_path, "index.json")
+    paths = [str(config("CLIMATE_PATH", default=""))]
+    paths += str(config("SPREADSHEET_SAVUKOSKI", default="")).split(";")[1:2]
+    paths.append(
+        store_index
+        if store_path and os.path.isfile(store_index)
+        else str(config("ALL_CAPITALS_SPREADSHEETS", default=""))
+    )
+
+    return artifact.get_sources(
+        paths, {name: str(config(name, default="")) for name in REPORT_SETTINGS}
+    )
+
+
+def build_report_from_artifact(path: str, sources: dict = None):
+    """Build the report from an artifact written by `build`
+
+    Args:
+        path (str): path of the artifact
+        sources (dict, optional): current inputs of the report, a stale artifact raises a
+            `ValueError`. Defaults to None (not checked).
+
+    Returns:
+        dash.Dash: application of the report
+    """
+    report_artifact = artifact.load(path, sources=sources)
+
+    return build_report(
+        # Rendered when displayed, keeping the first response small
+        tabs=[
+            lambda tab=tab: report_artifact["tabs"][tab]
+            for tab in ("tab-1", "tab-2", "tab-3")
+        ],
+        warm_stages=lambda: {stage: True for stage in report_artifact["stages"]},
+        get_series=report_artifact["series"].get,
     )
 
-    callbacks.zoom_in_dates_graph(
-        graph=stats_SI["annual_graph"], app=report, event="selectedData", granularity=15
+
+def build(path: str, print_: bool = False):
+    """Compute every stage of the report and serialize it into an artifact
+
+    Args:
+        path (str): path of the artifact
+        print_ (bool, optional): Print the timings of the stages on console. Defaults to False.
+    """
+    import pipeline
+
+    report_pipeline = pipeline.Pipeline(print_=print_)
+    statistics = report_pipeline.get("statistics")
+    references = report_pipeline.get("references")
+
+    artifact.save(
+        path,
+        tabs={
+            "tab-1": build_statistics_tab(statistics["SI"]),
+            "tab-2": build_statistics_tab(statistics["SI_ERRORS"]),
+            "tab-3": build_resolution_tab(
+                report_pipeline.get("dtw_proof"),
+                report_pipeline.get("savukoski"),
+                references,
+            ),
+        },
+        rankings=[
+            {
+                "name": reference["name"],
+                "score": float(reference["score"]),
+                **{
+                    metric: float(value)
+                    for metric, value in reference["stats_between_series"].items()
+                },
+            }
+            for reference in references
+        ],
+        stages=[stage for stage, warm in report_pipeline.warm().items() if warm],
+        sources=get_report_sources(),
+        series=dashboard.LARGE_GRAPH_SERIES,
     )
 
-    callbacks.zoom_in_dates_graph(
-        graph=stats_SI_ERRORS["annual_graph"],
-        app=report,
-        event="selectedData",
-        granularity=15,
+
+def create_app(
+    preload: bool = bool(int(config("REPORT_PRELOAD", default=1))),
+    print_: bool = False,
+):
+    """Application factory of the report
+
+    The report is served from the artifact when it exists and was built from the
+    current input files and settings, from the pipeline otherwise. With a WSGI server preloading the application (`gunicorn --preload`),
+    the report is loaded once and shared copy-on-write by the workers.
+
+    Args:
+        preload (bool, optional): Compute every stage before serving. Defaults to `config("REPORT_PRELOAD")`.
+        print_ (bool, optional): Print the timings of the stages on console. Defaults to False.
+
+    Returns:
+        dash.Dash: application of the report, `app.server` is its Flask server
+    """
+    artifact_path = config("REPORT_ARTIFACT", default=".data/report.json")
+    report = None
+
+    with timing.span("core.create_app"):
+        if artifact_path and os.path.isfile(artifact_path):
+            try:
+                report = build_report_from_artifact(
+                    artifact_path, sources=get_report_sources()
+                )
+            except ValueError as error:
+                if print_:
+                    print("artifact ignored:", error)
+
+        if report is None:
+            report = build_report_from_pipeline(print_=print_, preload=preload)
+
+    if print_:
+        print(timing.get_stage_timings().summary())
+
+    if preload:
+        # Objects loaded before fork are left out of the garbage collector,
+        # which would otherwise touch, and so copy, their memory pages in every worker
+        gc.freeze()
+
+    return report
+
+
+def run(debug: bool = bool(int(config("DEBUG")))):
+    """core main run
+
+    The report is served from the artifact when it is up to date. Otherwise the server
+    starts before any statistic is computed, each tab is computed the first time
+    it is displayed.
+
+    Args:
+        debug (bool, optional): Parameter to run on debug. Defaults to `bool(int(config("DEBUG")))`.
+    """
+    create_app(preload=False, print_=debug).run_server(debug=debug)
+
+
+def main(args: list):
+    """Command line of the report
+
+    Args:
+        args (list): command line parameters as list of strings
+    """
+    parser = argparse.ArgumentParser(description="Capital's climate problem report")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("serve", help="serve the report (default)")
+    build_parser = subparsers.add_parser(
+        "build", help="compute the report into an artifact"
+    )
+    build_parser.add_argument(
+        "--output", default=config("REPORT_ARTIFACT", default=".data/report.json")
     )
+    parsed = parser.parse_args(args)
 
-    report.run_server(debug=debug)
+    if parsed.command == "build":
+        build(parsed.output, print_=bool(int(config("DEBUG"))))
+    else:
+        run()
 
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    main(sys.argv[1:])
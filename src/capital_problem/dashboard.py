@@ -1,20 +1,45 @@
 import dash
+import flask
+import flask_compress
 import dash_core_components
 import dash_html_components
 from dash_html_components.Div import Div
 import dash_table
 import dash_bootstrap_components
-import pandas
 import plotly.graph_objects
+from dash.dependencies import Input, Output, State
 import json
 from decouple import config
+import timing
+
+# Full resolution series of the large graphs by name, drawn again by the server on zoom
+LARGE_GRAPH_SERIES = {}
 
 
 def build_app_report(
-    si_dash_components_list: list,
-    si_error_dash_components_list: list,
-    alternate_dash_components_list: list,
+    si_dash_components_list,
+    si_error_dash_components_list,
+    alternate_dash_components_list,
+    warm_stages=None,
+    explorer_dash_components_list=None,
 ):
+    """Build the dash application of the report
+
+    A tab given as a function is rendered the first time it is displayed, behind a
+    loading indicator.
+
+    Args:
+        si_dash_components_list (list or callable): components of the SI tab
+        si_error_dash_components_list (list or callable): components of the SI-erreur tab
+        alternate_dash_components_list (list or callable): components of the resolution tab
+        warm_stages (callable, optional): function returning the computed stages as `{stage: bool}`,
+            served on `/ready`. Defaults to None.
+        explorer_dash_components_list (list or callable, optional): components of the data explorer tab.
+            Defaults to None (no data explorer).
+
+    Returns:
+        dash.Dash: application of the report
+    """
     external_stylesheets = [
         {
             "href": "https://fonts.googleapis.com/css2?"
@@ -23,10 +48,27 @@ def build_app_report(
         },
     ]
     app = dash.Dash(
-        __name__, external_stylesheets=external_stylesheets, assets_url_path="/assets/"
+        __name__,
+        external_stylesheets=external_stylesheets,
+        assets_url_path="/assets/",
+        # Components of the lazy tabs are not in the initial layout
+        suppress_callback_exceptions=True,
+        # Compressed below, dash only enables gzip
+        compress=False,
     )
     app.title = "Capital's Climate Problem"
 
+    configure_server(app)
+
+    tabs = [
+        ("SI", "tab-1", si_dash_components_list),
+        ("SI-erreur", "tab-2", si_error_dash_components_list),
+        ("Resolution", "tab-3", alternate_dash_components_list),
+    ]
+
+    if explorer_dash_components_list is not None:
+        tabs.append(("Data explorer", "tab-4", explorer_dash_components_list))
+
     app.layout = dash_html_components.Div(
         children=[
             dash_html_components.Div(
@@ -51,37 +93,108 @@ def build_app_report(
                 value="tab-1",
                 children=[
                     dash_core_components.Tab(
-                        label="SI",
-                        value="tab-1",
-                        children=dash_html_components.Div(
-                            children=si_dash_components_list,
-                            className="visuals",
-                        ),
-                    ),
-                    dash_core_components.Tab(
-                        label="SI-erreur",
-                        value="tab-2",
-                        children=dash_html_components.Div(
-                            children=si_error_dash_components_list,
-                            className="visuals",
-                        ),
-                    ),
-                    dash_core_components.Tab(
-                        label="Resolution",
-                        value="tab-3",
-                        children=dash_html_components.Div(
-                            children=alternate_dash_components_list,
-                            className="visuals",
-                        ),
-                    ),
+                        label=label,
+                        value=value,
+                        children=build_tab_content(app, value, components),
+                    )
+                    for label, value, components in tabs
                 ],
             ),
         ]
     )
 
+    if warm_stages:
+
+        @app.server.route("/ready")
+        def ready():
+            stages = warm_stages()
+
+            return flask.jsonify(
+                {"ready": True, "warm": all(stages.values()), "stages": stages}
+            )
+
     return app
 
 
+def configure_server(app: dash.Dash):
+    """Compress the responses, let browsers cache the assets and serve the timings
+
+    Responses are compressed with the `COMPRESS_ALGORITHM` algorithms supported by the
+    browser. Assets are linked with their modification time by dash, so they are
+    cached for `ASSETS_MAX_AGE` seconds. The timings of the stages of this process
+    are served on `/metrics` in the Prometheus text format.
+
+    Args:
+        app (dash.Dash): application of the report
+    """
+    app.server.config["COMPRESS_ALGORITHM"] = config(
+        "COMPRESS_ALGORITHM", default="br;gzip"
+    ).split(";")
+    flask_compress.Compress(app.server)
+
+    assets_path = app.config.routes_pathname_prefix + app.config.assets_url_path.strip(
+        "/"
+    )
+    max_age = int(config("ASSETS_MAX_AGE", default=31536000))
+
+    @app.server.after_request
+    def cache_assets(response):
+        if response.status_code == 200 and flask.request.path.startswith(
+            assets_path + "/"
+        ):
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = max_age
+
+        return response
+
+    @app.server.route("/metrics")
+    def metrics():
+        return flask.Response(
+            timing.get_stage_timings().prometheus(),
+            mimetype="text/plain; version=0.0.4",
+        )
+
+
+def build_tab_content(app: dash.Dash, value: str, components):
+    """Content of a tab, rendered by a callback on first display when `components` is a function
+
+    Args:
+        app (dash.Dash): application of the report
+        value (str): value of the tab
+        components (list or callable): components of the tab, or function building them
+
+    Returns:
+        dash component of the tab
+    """
+    if not callable(components):
+        return dash_html_components.Div(children=components, className="visuals")
+
+    @app.callback(
+        Output(value + "-content", "children"),
+        Output(value + "-loaded", "data"),
+        Input("data-selector-tabs", "value"),
+        State(value + "-loaded", "data"),
+    )
+    @timing.timed("callbacks.render_" + value)
+    def render_tab(selected_tab, loaded):
+        # Rendered once, the browser keeps the components afterwards
+        if selected_tab != value or loaded:
+            raise dash.exceptions.PreventUpdate
+
+        return components(), True
+
+    return dash_html_components.Div(
+        children=[
+            dash_core_components.Store(id=value + "-loaded"),
+            dash_core_components.Loading(
+                dash_html_components.Div(id=value + "-content", className="visuals"),
+                type="circle",
+            ),
+        ]
+    )
+
+
 def build_table_component(headers: list, data: list, id: str):
     # need to check dimensions
     return dash_table.DataTable(
@@ -98,6 +211,32 @@ def build_table_component(headers: list, data: list, id: str):
     )
 
 
+def build_explorer_table(columns: list, id: str, page_size: int = 25):
+    """Table of which pages are sorted, filtered and sent by the server
+
+    Args:
+        columns (list): names of the columns
+        id (str): id of the table
+        page_size (int, optional): rows by page. Defaults to 25.
+
+    Returns:
+        dash_table.DataTable: empty table, filled by `callbacks.page_explorer_table`
+    """
+    return dash_table.DataTable(
+        id=id,
+        columns=[{"name": name, "id": name} for name in columns],
+        page_current=0,
+        page_size=page_size,
+        page_action="custom",
+        sort_action="custom",
+        sort_mode="multi",
+        sort_by=[],
+        filter_action="custom",
+        filter_query="",
+        style_as_list_view=True,
+    )
+
+
 def build_card_group(data_dict: dict, id: str):
     return dash_html_components.Div(
         children=[
@@ -123,9 +262,46 @@ def build_card_group(data_dict: dict, id: str):
     )
 
 
+def get_chart_max_points() -> int:
+    """Points drawn by trace of a large graph, about two by horizontal pixel
+
+    Returns:
+        int: `config("CHART_MAX_POINTS")`
+    """
+    return int(config("CHART_MAX_POINTS", default=2000))
+
+
+@timing.timed("dashboard.time_series_chart")
 def build_time_series_chart(
-    dates: pandas.Series, data_list: list, layout: dict, id: str, all_: bool = False
+    dates: "pandas.Series",
+    data_list: list,
+    layout: dict,
+    id: str,
+    all_: bool = False,
+    large: bool = None,
 ):
+    """Time series chart, one trace by series
+
+    Args:
+        dates (pandas.Series): x axis
+        data_list (list): named series of the traces
+        layout (dict): plotly layout
+        id (str): id of the graph
+        all_ (bool, optional): Show every trace, only the first one otherwise. Defaults to False.
+        large (bool, optional): Use the large data mode of `build_large_time_series_chart`.
+            Defaults to None (when there are more dates than `get_chart_max_points()`).
+
+    Returns:
+        dash_core_components.Graph: chart
+    """
+    if large is None:
+        large = len(dates) > get_chart_max_points()
+
+    if large:
+        return build_large_time_series_chart(
+            dates=dates, data_list=data_list, layout=layout, id=id, all_=all_
+        )
+
     graph_figure = plotly.graph_objects.Figure(layout=layout)
 
     for key, data in enumerate(data_list, start=0):
@@ -145,11 +321,104 @@ def build_time_series_chart(
     return dash_core_components.Graph(animate=True, figure=graph_figure, id=id)
 
 
+def build_large_time_series_chart(
+    dates: "pandas.Series", data_list: list, layout: dict, id: str, all_: bool = False
+):
+    """Time series chart drawn with WebGL lines, downsampled to `get_chart_max_points()` by trace
+
+    The full resolution series is kept by the server in `LARGE_GRAPH_SERIES`, zooming
+    on the graph `{"type": "large-graph", "index": id}` draws the visible window again
+    at full resolution (see `callbacks.refetch_large_graphs`).
+
+    Args:
+        dates (pandas.Series): x axis
+        data_list (list): named series of the traces
+        layout (dict): plotly layout
+        id (str): name of the graph
+        all_ (bool, optional): Show every trace, only the first one otherwise. Defaults to False.
+
+    Returns:
+        dash_core_components.Graph: chart
+    """
+    import numpy
+
+    dates = numpy.asarray(dates)
+    # Same ui revision on every redraw, plotly keeps the traces hidden by the user hidden
+    figure = plotly.graph_objects.Figure(layout=layout).update_layout(uirevision=id)
+    series = {
+        "dates": dates.dtype.kind == "M",
+        # Plotly resolution, millisecond datetimes are serialized as dates and not integers
+        "x": dates.astype("datetime64[ms]") if dates.dtype.kind == "M" else dates,
+        "traces": [
+            [data.name, numpy.asarray(data, dtype=numpy.float64)] for data in data_list
+        ],
+        "visible": [
+            "legendonly" if key and not all_ else None for key in range(len(data_list))
+        ],
+        "layout": figure.layout.to_plotly_json(),
+    }
+    LARGE_GRAPH_SERIES[id] = series
+
+    return dash_core_components.Graph(
+        figure=get_window_figure(series), id={"type": "large-graph", "index": id}
+    )
+
+
+def get_window_figure(series: dict, x_range: list = None) -> dict:
+    """Figure of a large graph between two x values
+
+    Args:
+        series (dict): full resolution series of `build_large_time_series_chart`, as built
+            or as loaded from an artifact
+        x_range (list, optional): first and last x values, as sent by plotly. Defaults to None (every value).
+
+    Returns:
+        dict: `{"data", "layout"}` figure with the downsampled traces of the window
+    """
+    import numpy
+    import compute
+
+    # Dates come from an artifact as strings, missing values as None
+    x_type = "datetime64[ms]" if series["dates"] else numpy.float64
+    x = numpy.asarray(series["x"], dtype=x_type)
+    start, stop = 0, len(x)
+
+    if x_range:
+        bounds = numpy.array(x_range, dtype=x_type)
+        # One more point on each side, for the lines to reach the edges
+        start = max(numpy.searchsorted(x, bounds[0], side="left") - 1, 0)
+        stop = min(numpy.searchsorted(x, bounds[1], side="right") + 1, len(x))
+
+    traces = []
+
+    for (trace_name, y), visible in zip(series["traces"], series["visible"]):
+        y = numpy.asarray(y, dtype=numpy.float64)
+        indices = compute.lttb(x[start:stop], y[start:stop], get_chart_max_points())
+        traces.append(
+            plotly.graph_objects.Scattergl(
+                x=x[start:stop][indices],
+                y=y[start:stop][indices],
+                mode="lines",
+                name=trace_name,
+                visible=visible,
+            )
+        )
+
+    layout = dict(series["layout"])
+    layout["xaxis"] = dict(
+        layout.get("xaxis", {}), range=x_range or None, autorange=not x_range
+    )
+
+    return {"data": traces, "layout": layout}
+
+
 if __name__ == "__main__":
     build_app_report(dash_components_list=[]).run_server(debug=True)
 
 
 def map_display():
+    import pandas
+
     with open("src/capital_problem/assets/capitals.geojson") as file:
         data = json.loads(file.read())
 
@@ -182,4 +451,4 @@ def map_display():
             ),
             margin={"r": 0, "t": 0, "l": 0, "b": 0},
         )
-        return dash_core_components.Graph(id="yolo", figure=figure)
\ No newline at end of file
+        return dash_core_components.Graph(id="yolo", figure=figure)
@@ -0,0 +1,240 @@
+import collections
+import re
+import threading
+import numpy
+import pandas
+
+# `{column} operator value` parts of a dash table `filter_query`, joined by `&&`
+FILTER_PART = re.compile(
+    r"\{(?P<column>[^}]+)\}\s*"
+    r"(?P<operator>s?(?:>=|<=|!=|>|<|=|ge|le|lt|gt|ne|eq)|contains|datestartswith)"
+    r"\s*(?P<value>.*)$"
+)
+
+OPERATORS = {
+    ">=": numpy.greater_equal,
+    "ge": numpy.greater_equal,
+    "<=": numpy.less_equal,
+    "le": numpy.less_equal,
+    ">": numpy.greater,
+    "gt": numpy.greater,
+    "<": numpy.less,
+    "lt": numpy.less,
+    "!=": numpy.not_equal,
+    "ne": numpy.not_equal,
+    "=": numpy.equal,
+    "eq": numpy.equal,
+}
+
+
+class DataExplorer:
+    """Columnar table answering the paged, sorted and filtered queries of a dash table
+
+    Text columns are stored as integer codes of their sorted categories, so
+    filtering them only compares the categories and sorting them sorts integers.
+    Sort permutations and filter masks of the latest queries are memoized.
+
+    Args:
+        dataframe (pandas.DataFrame): rows of the table, datetime columns are shown as days
+        memoized (int, optional): number of sort permutations and filter masks kept. Defaults to 16.
+    """
+
+    def __init__(self, dataframe: pandas.DataFrame, memoized: int = 16):
+        self.columns = {}
+        self.categories = {}
+        self.size = len(dataframe)
+        self.memoized = memoized
+        self.orders = collections.OrderedDict()
+        self.masks = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+        for name, column in dataframe.items():
+            values = column.to_numpy()
+
+            if values.dtype.kind == "M":
+                self.columns[name] = values.astype("datetime64[D]")
+            elif values.dtype.kind in "biuf":
+                self.columns[name] = values
+            else:
+                codes, categories = pandas.factorize(column, sort=True)
+                self.columns[name] = codes.astype(numpy.int32)
+                self.categories[name] = numpy.asarray(categories, dtype=str)
+
+    def memoize(self, memo: collections.OrderedDict, key, build):
+        with self.lock:
+            if key in memo:
+                memo.move_to_end(key)
+
+                return memo[key]
+
+        value = build()
+
+        with self.lock:
+            memo[key] = value
+
+            while len(memo) > self.memoized:
+                memo.popitem(last=False)
+
+        return value
+
+    def order(self, sort_by: list) -> numpy.ndarray:
+        """Permutation sorting the rows
+
+        Args:
+            sort_by (list): `{"column_id", "direction"}` dicts of the dash table, by priority
+
+        Returns:
+            numpy.ndarray: row indices, None when not sorted
+        """
+        sort_by = tuple(
+            (sort["column_id"], sort["direction"])
+            for sort in sort_by or []
+            if sort["column_id"] in self.columns
+        )
+
+        if not sort_by:
+            return None
+
+        def build():
+            keys = []
+
+            # numpy.lexsort sorts on the last key first
+            for name, direction in reversed(sort_by):
+                values = self.columns[name]
+
+                if values.dtype.kind == "M":
+                    values = values.astype(numpy.int64)
+
+                keys.append(-values if direction == "desc" else values)
+
+            return numpy.lexsort(keys)
+
+        return self.memoize(self.orders, sort_by, build)
+
+    def mask(self, filter_query: str) -> numpy.ndarray:
+        """Rows matching a dash table filter query, unknown parts are ignored
+
+        Args:
+            filter_query (str): `{column} operator value` parts joined by `&&`
+
+        Returns:
+            numpy.ndarray: boolean mask of the rows, None when nothing is filtered
+        """
+        parts = [
+            match.groupdict()
+            for match in (
+                FILTER_PART.match(part.strip())
+                for part in (filter_query or "").split("&&")
+            )
+            if match and match.group("column") in self.columns
+        ]
+
+        if not parts:
+            return None
+
+        def build():
+            mask = numpy.ones(self.size, dtype=bool)
+
+            for part in parts:
+                mask &= self.part_mask(**part)
+
+            return mask
+
+        return self.memoize(self.masks, filter_query, build)
+
+    def part_mask(self, column: str, operator: str, value: str) -> numpy.ndarray:
+        values = self.columns[column]
+        value = value.strip()
+
+        if len(value) > 1 and value[0] == value[-1] and value[0] in "\"'`":
+            value = value[1:-1]
+
+        operator = operator.lstrip("s")
+
+        if column in self.categories:
+            categories = self.categories[column]
+
+            if operator == "contains":
+                matching = (
+                    numpy.char.find(numpy.char.lower(categories), value.lower()) >= 0
+                )
+            elif operator == "datestartswith":
+                matching = numpy.char.startswith(categories, value)
+            else:
+                matching = OPERATORS[operator](categories, value)
+
+            return numpy.isin(values, numpy.flatnonzero(matching))
+
+        if values.dtype.kind == "M":
+            try:
+                start = numpy.datetime64(value)
+            except ValueError:
+                return numpy.zeros(self.size, dtype=bool)
+
+            if operator in ("datestartswith", "contains"):
+                # A year, a month or a day, as the range of its days
+                return (values >= start.astype("datetime64[D]")) & (
+                    values < (start + 1).astype("datetime64[D]")
+                )
+
+            return OPERATORS[operator](values, start.astype("datetime64[D]"))
+
+        try:
+            number = float(value)
+        except ValueError:
+            return numpy.zeros(self.size, dtype=bool)
+
+        if operator in ("datestartswith", "contains"):
+            operator = "="
+
+        return OPERATORS[operator](values, number)
+
+    def page(
+        self,
+        page_current: int,
+        page_size: int,
+        sort_by: list = None,
+        filter_query: str = None,
+    ) -> tuple:
+        """Rows of one page of the table
+
+        Args:
+            page_current (int): index of the page
+            page_size (int): rows by page
+            sort_by (list, optional): `sort_by` of the dash table. Defaults to None.
+            filter_query (str, optional): `filter_query` of the dash table. Defaults to None.
+
+        Returns:
+            tuple: `(records, page_count, row_count)` with the records of the page as dicts
+        """
+        order = self.order(sort_by)
+        mask = self.mask(filter_query)
+
+        if order is None:
+            rows = numpy.arange(self.size) if mask is None else numpy.flatnonzero(mask)
+        else:
+            rows = order if mask is None else order[mask[order]]
+
+        row_count = len(rows)
+        page_count = max(-(-row_count // page_size), 1)
+        rows = rows[page_current * page_size : (page_current + 1) * page_size]
+        records = [{} for _ in rows]
+
+        for name, values in self.columns.items():
+            values = values[rows]
+
+            if name in self.categories:
+                decoded = self.categories[name].astype(object)[values]
+                decoded[values < 0] = None
+                values = decoded.tolist()
+            elif values.dtype.kind == "M":
+                values = values.astype(str).tolist()
+            else:
+                values = [
+                    None if value != value else value for value in values.tolist()
+                ]
+
+            for record, value in zip(records, values):
+                record[name] = value
+
+        return records, page_count, row_count
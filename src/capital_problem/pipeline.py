@@ -0,0 +1,99 @@
+import threading
+from decouple import config
+import content
+import explorer
+import timing
+
+
+class Pipeline:
+    """Stages of the report, computed the first time they are requested then memoized
+
+    Stages are computed at most once, even when requested by concurrent callbacks.
+
+    Args:
+        print_ (bool, optional): Print the timings of the stages on console. Defaults to False.
+    """
+
+    def __init__(self, print_: bool = False):
+        self.print_ = print_
+        self.stages = {
+            "statistics": self.build_statistics,
+            "dtw_proof": self.build_dtw_proof,
+            "savukoski": self.build_savukoski,
+            "references": self.build_references,
+            "explorer": self.build_explorer,
+        }
+        self.results = {}
+        self.locks = {stage: threading.Lock() for stage in self.stages}
+
+    def get(self, stage: str):
+        """Result of a stage, computed on first request
+
+        Args:
+            stage (str): name of the stage
+
+        Returns:
+            the result of the stage
+        """
+        if stage not in self.results:
+            with self.locks[stage]:
+                if stage not in self.results:
+                    with timing.span("pipeline." + stage):
+                        self.results[stage] = self.stages[stage]()
+
+                    if self.print_:
+                        print(timing.get_stage_timings().summary())
+
+        return self.results[stage]
+
+    def warm(self) -> dict:
+        """Stages already computed
+
+        Returns:
+            dict: `{stage: bool}`
+        """
+        return {stage: stage in self.results for stage in self.stages}
+
+    def build_statistics(self) -> dict:
+        # Both sheets are read from one opening of the climate workbook
+        with content.ClimateWorkbook() as workbook:
+            return {
+                "SI": content.get_statistics(
+                    sheet_name=config("CLIMATE_SHEET_SI"),
+                    print_=self.print_,
+                    workbook=workbook,
+                ),
+                "SI_ERRORS": content.get_statistics(
+                    sheet_name=config("CLIMATE_SHEET_SI_ERROR"),
+                    print_=self.print_,
+                    workbook=workbook,
+                ),
+            }
+
+    def stacked_temperatures(self) -> list:
+        statistics = self.get("statistics")
+
+        return [
+            statistics["SI"]["stacked_temperatures"],
+            statistics["SI_ERRORS"]["stacked_temperatures"],
+        ]
+
+    def build_dtw_proof(self) -> dict:
+        return content.get_statistics_dtw_proof(
+            stacked_temperatures=self.stacked_temperatures(), print_=self.print_
+        )
+
+    def build_savukoski(self) -> dict:
+        return content.get_savukoski_statistics(
+            stacked_temperatures=self.stacked_temperatures(), print_=self.print_
+        )
+
+    def build_references(self) -> list:
+        return content.get_references_statistics(
+            stacked_temperatures=self.stacked_temperatures(), print_=self.print_
+        )
+
+    def build_explorer(self) -> explorer.DataExplorer:
+        return explorer.DataExplorer(
+            content.get_explorer_spreadsheet(print_=self.print_)
+        )
@@ -0,0 +1,336 @@
+import argparse
+import calendar
+import sys
+import numpy
+import pandas
+from decouple import config
+import compute
+import store
+
+
+def get_candidates(
+    temperature_store: store.TemperatureStore,
+    name: str,
+    query_dates: pandas.Series,
+    max_missing: float = 0.1,
+) -> tuple:
+    """Temperatures of every stored year of a city, on the query's days
+
+    Temperatures are converted from °F to °C and missing days are linearly
+    interpolated. Years missing more than `max_missing` of the days are dropped.
+
+    Args:
+        temperature_store (store.TemperatureStore): ingested temperature store
+        name (str): name of the city
+        query_dates (pandas.Series): dates of the query, only month and day are used
+        max_missing (float, optional): maximum share of missing days. Defaults to 0.1.
+
+    Returns:
+        tuple: `(years, values)` with `values` of shape `(len(years), len(query_dates))`
+    """
+    years = numpy.array(temperature_store.years(name))
+    array = temperature_store.array(name)
+    query_dates = pandas.DatetimeIndex(query_dates)
+
+    # Same month and day on every year, days missing from a year (29th of February) are invalid
+    months = (years[:, None] - 1970).astype("datetime64[Y]").astype("datetime64[M]") + (
+        query_dates.month.to_numpy() - 1
+    )
+    dates = months.astype("datetime64[D]") + (query_dates.day.to_numpy() - 1)
+    offsets = (dates - numpy.datetime64(temperature_store.city(name)["start"])).astype(
+        numpy.int64
+    )
+    offsets = offsets.ravel()
+    valid = (
+        (dates.astype("datetime64[M]") == months).ravel()
+        & (offsets >= 0)
+        & (offsets < len(array))
+    )
+
+    values = numpy.full(len(offsets), numpy.nan)
+    values[valid] = array[offsets[valid]]
+    values = ((values - 32) * 5 / 9).reshape(len(years), len(query_dates))
+
+    missing = numpy.isnan(values)
+    kept = missing.mean(axis=1) <= max_missing
+    days = numpy.arange(len(query_dates))
+
+    for row in numpy.flatnonzero(kept & missing.any(axis=1)):
+        values[row, missing[row]] = numpy.interp(
+            days[missing[row]], days[~missing[row]], values[row, ~missing[row]]
+        )
+
+    return years[kept], values[kept]
+
+
+def search_references(
+    query_dates: pandas.Series,
+    query_values: pandas.Series,
+    temperature_store: store.TemperatureStore,
+    window: int = 0,
+    shortlist: int = 50,
+    print_: bool = False,
+) -> list:
+    """Rank every city and year of the temperature store against a query
+
+    dtw and std are computed for every city-year, city by city from the
+    memory-mapped store. pcm and the score are only computed for the
+    `shortlist` city-years with the lowest dtw, on the temperatures read for
+    the dtw. The score is the one of `content.get_references_statistics`,
+    normalized on the shortlist.
+
+    Args:
+        query_dates (pandas.Series): dates of the query
+        query_values (pandas.Series): temperatures of the query in °C
+        temperature_store (store.TemperatureStore): ingested temperature store
+        window (int, optional): Sakoe-Chiba band width of the dtw in days. Defaults to 0 (lock-step).
+        shortlist (int, optional): number of city-years fully scored. Defaults to 50.
+        print_ (bool, optional): Print progress on console. Defaults to False.
+
+    Returns:
+        list: `{"name", "year", "dtw", "pcm", "std", "score"}` dicts sorted by score
+    """
+    query = compute.align_on_axis(query_dates, query_dates, query_values)
+    days = numpy.arange(len(query))
+    names, years, rows, dtws, stds = [], [], [], [], []
+
+    for name in temperature_store.cities:
+        city_years, candidates = get_candidates(temperature_store, name, query_dates)
+
+        if not len(city_years):
+            continue
+
+        names += [name] * len(city_years)
+        years.append(city_years)
+        rows.append(candidates)
+        dtws.append(compute.dtw_one_to_many(query, candidates, window))
+        stds.append(numpy.abs(numpy.nanstd(candidates, axis=1) - numpy.nanstd(query)))
+
+    if not names:
+        return []
+
+    years, rows, dtws, stds = (
+        numpy.concatenate(years),
+        numpy.concatenate(rows),
+        numpy.concatenate(dtws),
+        numpy.concatenate(stds),
+    )
+
+    if print_:
+        print("search :", len(names), "city-years compared")
+
+    references = []
+
+    for index in numpy.argsort(dtws, kind="stable")[:shortlist]:
+        references.append(
+            {
+                "name": names[index],
+                "year": int(years[index]),
+                "dtw": float(dtws[index]),
+                "pcm": compute.partial_curve_mapping(
+                    numpy.column_stack([days, query]),
+                    numpy.column_stack([days, rows[index]]),
+                ),
+                "std": float(stds[index]),
+            }
+        )
+
+    highs = {
+        metric: max(reference[metric] for reference in references) or 1.0
+        for metric in ("dtw", "pcm", "std")
+    }
+
+    for reference in references:
+        reference["score"] = sum(
+            reference[metric] / high for metric, high in highs.items()
+        )
+
+    references.sort(key=lambda k: k["score"])
+
+    return references
+
+
+def calendar_shift(first_day: pandas.Timestamp, match_start: pandas.Timestamp) -> int:
+    """Days between a match's first day and the nearest anniversary of the query's first day
+
+    The anniversaries of the years before, of and after the match are compared, so a
+    match starting on 2017-12-29 for a query starting on 2018-01-01 is 3 days early.
+    A query starting on the 29th of February has its anniversary on the 28th on
+    non-leap years.
+
+    Args:
+        first_day (pandas.Timestamp): first day of the query
+        match_start (pandas.Timestamp): first day of the match
+
+    Returns:
+        int: shift in days, negative when the match starts before the anniversary
+    """
+    shifts = []
+
+    for year in (match_start.year - 1, match_start.year, match_start.year + 1):
+        day = first_day.day
+
+        if first_day.month == 2 and day == 29 and not calendar.isleap(year):
+            day = 28
+
+        anniversary = pandas.Timestamp(year=year, month=first_day.month, day=day)
+        shifts.append((match_start.normalize() - anniversary).days)
+
+    return min(shifts, key=abs)
+
+
+def search_subsequences(
+    query_dates: pandas.Series,
+    query_values: pandas.Series,
+    temperature_store: store.TemperatureStore,
+    per_city: int = 3,
+    normalize: bool = False,
+    max_missing: float = 0.1,
+    print_: bool = False,
+) -> list:
+    """Slide the query over the whole history of every city of the temperature store
+
+    Each city costs one `compute.sliding_distances` pass, which finds the best
+    matching year and its calendar shift at once. Windows missing more than
+    `max_missing` of their days are ignored.
+
+    Args:
+        query_dates (pandas.Series): dates of the query
+        query_values (pandas.Series): temperatures of the query in °C
+        temperature_store (store.TemperatureStore): ingested temperature store
+        per_city (int, optional): best matches kept for each city, at least half a query apart. Defaults to 3.
+        normalize (bool, optional): compare z-normalized subsequences. Defaults to False.
+        max_missing (float, optional): maximum share of missing days in a window. Defaults to 0.1.
+        print_ (bool, optional): Print progress on console. Defaults to False.
+
+    Returns:
+        list: `{"name", "start", "shift", "distance"}` dicts sorted by distance, `shift` is the
+        number of days between the match's first day and the nearest anniversary of the query's
+        first day (see `calendar_shift`)
+    """
+    query = compute.align_on_axis(query_dates, query_dates, query_values)
+    first_day = pandas.Timestamp(pandas.DatetimeIndex(query_dates)[0])
+    matches = []
+
+    for name in temperature_store.cities:
+        array = temperature_store.array(name)
+
+        if len(array) < len(query):
+            continue
+
+        series = (numpy.asarray(array, dtype=numpy.float64) - 32) * 5 / 9
+        missing = numpy.isnan(series)
+
+        if missing.all():
+            continue
+
+        days = numpy.arange(len(series))
+        series[missing] = numpy.interp(days[missing], days[~missing], series[~missing])
+
+        distances = compute.sliding_distances(query, series, normalize)
+        missing_days = numpy.concatenate([[0], numpy.cumsum(missing)])
+        distances[
+            missing_days[len(query) :] - missing_days[: -len(query)]
+            > max_missing * len(query)
+        ] = numpy.inf
+
+        start = pandas.Timestamp(temperature_store.city(name)["start"])
+
+        for offset in compute.best_offsets(distances, per_city, len(query) // 2):
+            if numpy.isinf(distances[offset]):
+                continue
+
+            match_start = start + pandas.Timedelta(days=int(offset))
+            matches.append(
+                {
+                    "name": name,
+                    "start": match_start,
+                    "shift": calendar_shift(first_day, match_start),
+                    "distance": float(distances[offset]),
+                }
+            )
+
+    if print_:
+        print("sliding search :", len(temperature_store.cities), "cities compared")
+
+    matches.sort(key=lambda k: k["distance"])
+
+    return matches
+
+
+def run(args: list):
+    """Rank every city and year of the temperature store against the SI sheet
+
+    Args:
+        args (list): command line parameters as list of strings
+    """
+    import content
+
+    parser = argparse.ArgumentParser(description="Search every city and year")
+    parser.add_argument("--store", default=content.get_references_store_path())
+    parser.add_argument("--sheet", default=config("CLIMATE_SHEET_SI"))
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--shortlist", type=int, default=50)
+    parser.add_argument(
+        "--sliding", action="store_true", help="slide over the whole histories"
+    )
+    parser.add_argument(
+        "--normalize", action="store_true", help="z-normalize the sliding windows"
+    )
+    parsed = parser.parse_args(args)
+
+    stacked_temperatures = content.get_statistics(sheet_name=parsed.sheet)[
+        "stacked_temperatures"
+    ]
+
+    if parsed.sliding:
+        matches = search_subsequences(
+            query_dates=stacked_temperatures["full_date"],
+            query_values=stacked_temperatures["Temperature"],
+            temperature_store=store.TemperatureStore(parsed.store),
+            normalize=parsed.normalize,
+            print_=True,
+        )
+
+        for rank, match in enumerate(matches[: parsed.top], start=1):
+            print(
+                rank,
+                match["name"],
+                match["start"].strftime("%Y-%m-%d"),
+                ": { shift :",
+                match["shift"],
+                ", distance :",
+                round(match["distance"], 2),
+                "}",
+            )
+
+        return
+
+    references = search_references(
+        query_dates=stacked_temperatures["full_date"],
+        query_values=stacked_temperatures["Temperature"],
+        temperature_store=store.TemperatureStore(parsed.store),
+        window=content.get_dtw_window(),
+        shortlist=parsed.shortlist,
+        print_=True,
+    )
+
+    for rank, reference in enumerate(references[: parsed.top], start=1):
+        print(
+            rank,
+            reference["name"],
+            reference["year"],
+            ": { score :",
+            round(reference["score"], 3),
+            ", dtw :",
+            round(reference["dtw"], 2),
+            ", pcm :",
+            round(reference["pcm"], 2),
+            ", std :",
+            round(reference["std"], 2),
+            "}",
+        )
+
+
+if __name__ == "__main__":
+    run(sys.argv[1:])
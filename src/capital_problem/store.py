@@ -0,0 +1,322 @@
+import argparse
+import json
+import os
+import sys
+import numpy
+import pandas
+from decouple import config
+
+# Bump when the layout of the store changes
+STORE_VERSION = 1
+
+# Kaggle dataset columns, in the order of `ALL_CAPITALS_SPREADSHEETS_COLUMNS`
+DEFAULT_COLUMNS = "Year,Month,Day,AvgTemperature,City,Region"
+
+
+class TemperatureStore:
+    """Daily temperatures partitioned by city, memory-mapped on read
+
+    Each city is one contiguous float32 array with a value for every day from its
+    first to its last observation (`numpy.nan` when missing), and an index of the
+    offset of every year in that array.
+
+    Args:
+        path (str, optional): directory of the store. Defaults to `config("REFERENCES_STORE")`.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or config("REFERENCES_STORE", default=".data/store")
+
+        with open(os.path.join(self.path, "index.json")) as file:
+            self.index = json.load(file)
+
+        if self.index.get("version") != STORE_VERSION:
+            raise ValueError("Unsupported store version, ingest the dataset again")
+
+        self.arrays = {}
+
+    @property
+    def cities(self) -> list:
+        return sorted(self.index["cities"])
+
+    def city(self, name: str) -> dict:
+        """Metadata of a city
+
+        Args:
+            name (str): name of the city
+
+        Returns:
+            dict: `{"file": str, "region": str, "start": str, "years": {str: [offset, length]}}`
+        """
+        return self.index["cities"][name]
+
+    def years(self, name: str) -> list:
+        return sorted(int(year) for year in self.city(name)["years"])
+
+    def array(self, name: str) -> numpy.ndarray:
+        """Whole memory-mapped array of a city, mapped once
+
+        Args:
+            name (str): name of the city
+
+        Returns:
+            numpy.ndarray: read-only float32 daily temperatures
+        """
+        if name not in self.arrays:
+            self.arrays[name] = numpy.load(
+                os.path.join(self.path, self.city(name)["file"]), mmap_mode="r"
+            )
+
+        return self.arrays[name]
+
+    def temperatures(
+        self, name: str, first_year: int = None, last_year: int = None
+    ) -> tuple:
+        """Temperatures of a city between two years, as a zero-copy slice
+
+        Args:
+            name (str): name of the city
+            first_year (int, optional): first year included. Defaults to None (first stored year).
+            last_year (int, optional): last year included. Defaults to None (last stored year).
+
+        Returns:
+            tuple: `(pandas.DatetimeIndex, numpy.ndarray)` dates and temperatures
+        """
+        metadata = self.city(name)
+        years = self.years(name)
+        years = [
+            year
+            for year in years
+            if (first_year is None or year >= first_year)
+            and (last_year is None or year <= last_year)
+        ]
+
+        if not years:
+            return pandas.DatetimeIndex([]), self.array(name)[:0]
+
+        start = metadata["years"][str(years[0])][0]
+        stop = sum(metadata["years"][str(years[-1])])
+
+        dates = pandas.Timestamp(metadata["start"]) + pandas.to_timedelta(
+            numpy.arange(start, stop), unit="D"
+        )
+
+        return pandas.DatetimeIndex(dates), self.array(name)[start:stop]
+
+
+def assemble_dates(
+    year: pandas.Series, month: pandas.Series, day: pandas.Series
+) -> pandas.Series:
+    """Assemble dates from year, month and day numbers, without formatting or parsing strings
+
+    Args:
+        year (pandas.Series): years
+        month (pandas.Series): months, from 1 to 12
+        day (pandas.Series): days of the month
+
+    Returns:
+        pandas.Series: dates on the index of `year`, `NaT` where the day does not exist
+    """
+    years, months, days = (
+        pandas.to_numeric(pandas.Series(values), errors="coerce")
+        .fillna(0)
+        .to_numpy(dtype=numpy.int64)
+        for values in (year, month, day)
+    )
+
+    # Days overflowing their month land on the next one and are invalid, as the
+    # years out of the nanoseconds range of pandas
+    firsts = ((years - 1970) * 12 + months - 1).astype("datetime64[M]")
+    dates = firsts.astype("datetime64[D]") + (days - 1)
+    valid = (
+        (years > 1677)
+        & (years < 2262)
+        & (months >= 1)
+        & (months <= 12)
+        & (days >= 1)
+        & (dates.astype("datetime64[M]") == firsts)
+    )
+
+    return pandas.Series(
+        numpy.where(valid, dates, numpy.datetime64("NaT")).astype("datetime64[ns]"),
+        index=year.index,
+    )
+
+
+def read_filtered_csv(
+    path: str,
+    columns: dict,
+    dtypes: dict,
+    filters: dict,
+    chunksize: int = 500000,
+) -> pandas.DataFrame:
+    """Read a csv by chunks, only the rows matching the filters are kept in memory
+
+    Each chunk is parsed with its own categories, the categorical columns are
+    given the union of the values kept so that they stay categorical once
+    concatenated.
+
+    Args:
+        path (str): path of the csv
+        columns (dict): columns to read with their new name
+        dtypes (dict): dtype of the columns to read
+        filters (dict): allowed values by renamed column
+        chunksize (int, optional): rows by chunk. Defaults to 500000.
+
+    Returns:
+        pandas.DataFrame: filtered rows with renamed columns, empty with the same columns
+        and dtypes when no row matches
+    """
+    chunks = []
+
+    for chunk in pandas.read_csv(
+        path,
+        delimiter=",",
+        usecols=list(columns),
+        dtype=dtypes,
+        chunksize=chunksize,
+    ):
+        chunk.rename(columns=columns, inplace=True)
+
+        for column, values in filters.items():
+            chunk = chunk[chunk[column].isin(values)]
+
+        chunks.append(chunk)
+
+    if not chunks:
+        return pandas.DataFrame(
+            {
+                name: pandas.Series(dtype=dtypes[column])
+                for column, name in columns.items()
+            }
+        )
+
+    categories = {
+        column: pandas.CategoricalDtype(
+            pandas.api.types.union_categoricals(
+                [chunk[column] for chunk in chunks], sort_categories=True
+            )
+            .remove_unused_categories()
+            .categories
+        )
+        for column, dtype in chunks[0].dtypes.items()
+        if isinstance(dtype, pandas.CategoricalDtype)
+    }
+
+    return pandas.concat(
+        [chunk.astype(categories) for chunk in chunks], ignore_index=True
+    )
+
+
+def ingest(
+    csv_path: str,
+    store_path: str,
+    columns: str = DEFAULT_COLUMNS,
+    chunksize: int = 500000,
+    print_: bool = False,
+):
+    """Convert the Kaggle daily temperatures csv into a `TemperatureStore`
+
+    Temperatures are kept in the dataset unit, unset temperatures (-99) become `numpy.nan`.
+
+    Args:
+        csv_path (str): path of the csv
+        store_path (str): directory of the store, created if needed
+        columns (str, optional): year, month, day, temperature, city and region columns. Defaults to `DEFAULT_COLUMNS`.
+        chunksize (int, optional): rows read at once. Defaults to 500000.
+        print_ (bool, optional): Print the ingested cities on console. Defaults to False.
+    """
+    columns = columns.split(",")
+    names = ["Year", "Month", "Day", "Temperature", "City", "Region"]
+
+    dataset = read_filtered_csv(
+        csv_path,
+        columns=dict(zip(columns, names)),
+        dtypes=dict(
+            zip(
+                columns,
+                ["int16", "int16", "int16", "float32", "category", "category"],
+            )
+        ),
+        filters={},
+        chunksize=chunksize,
+    )
+
+    dataset["date"] = assemble_dates(dataset["Year"], dataset["Month"], dataset["Day"])
+    dataset = dataset[dataset["date"].notna()].drop_duplicates(subset=["City", "date"])
+    dataset.loc[dataset["Temperature"] <= -99, "Temperature"] = numpy.nan
+
+    os.makedirs(store_path, exist_ok=True)
+    cities = {}
+
+    for key, (name, city) in enumerate(
+        dataset.groupby(dataset["City"].astype(str), sort=True)
+    ):
+        start = city["date"].min()
+        days = (city["date"] - start).dt.days.to_numpy()
+
+        temperatures = numpy.full(days.max() + 1, numpy.nan, dtype=numpy.float32)
+        temperatures[days] = city["Temperature"].to_numpy()
+
+        file_name = str(key) + ".npy"
+        numpy.save(os.path.join(store_path, file_name), temperatures)
+
+        dates = pandas.date_range(start, periods=len(temperatures))
+        offsets = pandas.Series(numpy.arange(len(dates))).groupby(dates.year)
+
+        cities[name] = {
+            "file": file_name,
+            "region": str(city["Region"].iloc[0]),
+            "start": start.strftime("%Y-%m-%d"),
+            "years": {
+                str(year): [int(group.iloc[0]), len(group)] for year, group in offsets
+            },
+        }
+
+        if print_:
+            print(name, ":", len(temperatures), "days from", cities[name]["start"])
+
+    with open(os.path.join(store_path, "index.json"), "w") as file:
+        json.dump({"version": STORE_VERSION, "cities": cities}, file)
+
+
+def run(args: list):
+    """Command line of the store
+
+    Args:
+        args (list): command line parameters as list of strings
+    """
+    parser = argparse.ArgumentParser(description="Temperature store of the references")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser(
+        "ingest", help="convert the Kaggle csv into a store"
+    )
+    ingest_parser.add_argument(
+        "--csv", default=config("ALL_CAPITALS_SPREADSHEETS", default=None)
+    )
+    ingest_parser.add_argument(
+        "--store", default=config("REFERENCES_STORE", default=".data/store")
+    )
+    ingest_parser.add_argument(
+        "--columns",
+        default=config("ALL_CAPITALS_SPREADSHEETS_COLUMNS", default=DEFAULT_COLUMNS),
+    )
+    ingest_parser.add_argument(
+        "--chunksize", type=int, default=int(config("CSV_CHUNK_SIZE", default=500000))
+    )
+
+    parsed = parser.parse_args(args)
+
+    if parsed.command == "ingest":
+        ingest(
+            csv_path=parsed.csv,
+            store_path=parsed.store,
+            columns=parsed.columns,
+            chunksize=parsed.chunksize,
+            print_=True,
+        )
+
+
+if __name__ == "__main__":
+    run(sys.argv[1:])
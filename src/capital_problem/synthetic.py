@@ -0,0 +1,392 @@
+import argparse
+import os
+import string
+import sys
+import numpy
+import pandas
+from decouple import Csv, config
+
+# Capitals of the `.env.dist`, the number of cities generated by default
+DEFAULT_CAPITALS = (
+    "Amsterdam;Athens;Belgrade;Berlin;Bratislava;Brussels;Bucharest;Bern;Budapest;"
+    "Copenhagen;Dublin;Helsinki;Kiev;Lisbon;London;Madrid;Minsk;Moscow;Oslo;Paris;"
+    "Prague;Reykjavik;Riga;Rome;Sofia;Stockholm;Tirana;Vienna;Warsaw"
+).split(";")
+
+# Capitals filtered by the app, the first cities of the generated datasets. An
+# empty `CAPITALS_LIST` (no filter) falls back to `DEFAULT_CAPITALS`
+CAPITALS = (
+    config("CAPITALS_LIST", cast=Csv(delimiter=";"), default="") or DEFAULT_CAPITALS
+)
+
+# Regions of the Kaggle dataset, given in turn to the cities after the capitals
+REGIONS = (
+    "Africa",
+    "Asia",
+    "Australia/South Pacific",
+    "Europe",
+    "Middle East",
+    "North America",
+    "South/Central America & Carribean",
+)
+
+# Month headers of the climate workbook
+MONTH_HEADERS = (
+    "Janvier",
+    "Février",
+    "Mars",
+    "Avril",
+    "Mai",
+    "Juin",
+    "Juillet",
+    "Août",
+    "Septembre",
+    "Octobre",
+    "Novembre",
+    "Décembre",
+)
+
+# Unreadable values found in the SI-erreur sheet
+GARBAGE = ("0xFFFF", "sun")
+
+
+def seasonal_temperatures(
+    dates: pandas.DatetimeIndex,
+    mean: float = 5,
+    amplitude: float = 12,
+    noise: float = 3,
+    random: numpy.random.Generator = None,
+) -> numpy.ndarray:
+    """Daily temperatures in °C, a yearly cycle coldest mid January with correlated noise
+
+    Args:
+        dates (pandas.DatetimeIndex): days of the temperatures
+        mean (float, optional): yearly mean. Defaults to 5.
+        amplitude (float, optional): half of the gap between summer and winter. Defaults to 12.
+        noise (float, optional): standard deviation of the daily weather. Defaults to 3.
+        random (numpy.random.Generator, optional): random generator. Defaults to None (seeded with 0).
+
+    Returns:
+        numpy.ndarray: one temperature by date
+    """
+    random = random or numpy.random.default_rng(0)
+    days = dates.dayofyear.to_numpy()
+
+    # Weather lasts a few days, the white noise is smoothed then scaled back
+    kernel = numpy.exp(-numpy.arange(-6, 7) ** 2 / 8)
+    weather = numpy.convolve(random.normal(0, 1, len(dates)), kernel, mode="same")
+    weather *= noise / numpy.sqrt(numpy.sum(kernel**2))
+
+    return mean - amplitude * numpy.cos(2 * numpy.pi * (days - 15) / 365.25) + weather
+
+
+def inject_errors(
+    values: numpy.ndarray,
+    rate: float,
+    random: numpy.random.Generator = None,
+    garbage: bool = True,
+) -> numpy.ndarray:
+    """Replace some values by spikes and unreadable values, as in the SI-erreur sheet
+
+    Args:
+        values (numpy.ndarray): temperatures in °C
+        rate (float): share of the values replaced
+        random (numpy.random.Generator, optional): random generator. Defaults to None (seeded with 0).
+        garbage (bool, optional): Replace half of them by `GARBAGE` strings, spikes only otherwise.
+            Defaults to True.
+
+    Returns:
+        numpy.ndarray: copy of the values, of object dtype when garbage is injected
+    """
+    random = random or numpy.random.default_rng(0)
+    values = values.astype(object if garbage else float)
+    errors = numpy.flatnonzero(random.random(len(values)) < rate)
+    strings = random.random(len(errors)) < (0.5 if garbage else 0)
+
+    spikes = errors[~strings]
+    values[spikes] = numpy.round(
+        values[spikes].astype(float)
+        + random.choice([-1, 1], len(spikes)) * random.uniform(20, 40, len(spikes)),
+        1,
+    )
+    values[errors[strings]] = random.choice(GARBAGE, strings.sum())
+
+    return values
+
+
+def column_index(letters: str) -> int:
+    """Index of a spreadsheet column, `A` is 0"""
+    index = 0
+
+    for letter in letters.strip().upper():
+        index = index * 26 + string.ascii_uppercase.index(letter) + 1
+
+    return index - 1
+
+
+def write_climate_workbook(
+    path: str,
+    year: int = 2018,
+    sheets: dict = None,
+    error_rate: float = 0.03,
+    seed: int = 0,
+):
+    """Write a workbook in the layout of `Climat.xlsx`, read with the `CLIMATE_*` settings
+
+    Each sheet has a title, a header row at `CLIMATE_HEADER`, then `J1` to `J31` day rows
+    with one column by month, in `CLIMATE_COL_RANGE` at `DAY_COL_INDEX` and `MONTH_COLUMNS`.
+    Days missing from a month are left empty.
+
+    Args:
+        path (str): path of the workbook
+        year (int, optional): year of the temperatures. Defaults to 2018.
+        sheets (dict, optional): `{sheet_name: bool}` sheets to write, with errors when True.
+            Defaults to the `CLIMATE_SHEET_SI` sheet without errors and the `CLIMATE_SHEET_SI_ERROR` one with.
+        error_rate (float, optional): share of the temperatures replaced in the sheets with errors.
+            Defaults to 0.03.
+        seed (int, optional): seed of the random generator. Defaults to 0.
+    """
+    if sheets is None:
+        sheets = {
+            config("CLIMATE_SHEET_SI", default="SI "): False,
+            config("CLIMATE_SHEET_SI_ERROR", default="SI -erreur"): True,
+        }
+
+    first, last = map(
+        column_index, config("CLIMATE_COL_RANGE", default="C:O").split(":")
+    )
+    header = int(config("CLIMATE_HEADER", default=3))
+    day_column = first + int(config("DAY_COL_INDEX", default=0))
+    month_columns = [
+        first + int(index)
+        for index in str(
+            config("MONTH_COLUMNS", default="1,2,3,4,5,6,7,8,9,10,11,12")
+        ).split(",")
+    ]
+
+    random = numpy.random.default_rng(seed)
+    dates = pandas.date_range(str(year) + "-01-01", str(year) + "-12-31")
+    temperatures = seasonal_temperatures(dates, random=random)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    with pandas.ExcelWriter(path) as writer:
+        for sheet_name, errors in sheets.items():
+            values = temperatures.round(1)
+
+            if errors:
+                values = inject_errors(values, error_rate, random=random)
+
+            grid = numpy.full((header + 31, last + 1), None, dtype=object)
+            grid[0, first] = "Relevés de températures " + str(year)
+            grid[header - 1, day_column] = "Jour"
+            grid[header:, day_column] = ["J" + str(day) for day in range(1, 32)]
+
+            for month, column in enumerate(month_columns):
+                grid[header - 1, column] = MONTH_HEADERS[month]
+
+            grid[
+                header - 1 + dates.day.to_numpy(),
+                numpy.array(month_columns)[dates.month.to_numpy() - 1],
+            ] = values
+
+            pandas.DataFrame(grid).to_excel(
+                writer, sheet_name=sheet_name, header=False, index=False
+            )
+
+
+def write_observations_workbook(
+    path: str,
+    years: list = (2018,),
+    sheet_name: str = "Observation data",
+    mean: float = 0,
+    amplitude: float = 14,
+    seed: int = 0,
+):
+    """Write a workbook in the layout of the FMI daily observations, as `Savukoski kirkonkyla.xlsx`
+
+    Args:
+        path (str): path of the workbook
+        years (list, optional): years of the observations. Defaults to (2018,).
+        sheet_name (str, optional): name of the sheet. Defaults to "Observation data".
+        mean (float, optional): yearly mean temperature. Defaults to 0.
+        amplitude (float, optional): half of the gap between summer and winter. Defaults to 14.
+        seed (int, optional): seed of the random generator. Defaults to 0.
+    """
+    dates = pandas.date_range(str(min(years)) + "-01-01", str(max(years)) + "-12-31")
+    dates = dates[dates.year.isin(years)]
+    random = numpy.random.default_rng(seed)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    pandas.DataFrame(
+        {
+            "Year": dates.year,
+            "m": dates.month,
+            "d": dates.day,
+            "Time": "00:00",
+            "Time zone": "UTC",
+            "Air temperature (degC)": seasonal_temperatures(
+                dates, mean=mean, amplitude=amplitude, random=random
+            ).round(1),
+        }
+    ).to_excel(path, sheet_name=sheet_name, index=False)
+
+
+def write_capitals_csv(
+    path: str,
+    cities: int = len(DEFAULT_CAPITALS),
+    years: list = (2018,),
+    missing_rate: float = 0.01,
+    error_rate: float = 0.001,
+    seed: int = 0,
+    chunk_cities: int = 50,
+) -> int:
+    """Write a csv in the schema of the Kaggle daily temperature of major cities
+
+    The first cities are the `CAPITALS` in Europe, the next ones are named `City n`
+    in every region. Temperatures are in °F, missing ones are -99 as in the dataset.
+    Rows are written by chunks of cities, the dataset never is in memory at once.
+
+    Args:
+        path (str): path of the csv
+        cities (int, optional): number of cities. Defaults to `len(DEFAULT_CAPITALS)`.
+        years (list, optional): years of the temperatures. Defaults to (2018,).
+        missing_rate (float, optional): share of the temperatures missing. Defaults to 0.01.
+        error_rate (float, optional): share of the temperatures replaced by spikes. Defaults to 0.001.
+        seed (int, optional): seed of the random generator. Defaults to 0.
+        chunk_cities (int, optional): cities written at once. Defaults to 50.
+
+    Returns:
+        int: number of rows written
+    """
+    dates = pandas.date_range(str(min(years)) + "-01-01", str(max(years)) + "-12-31")
+    dates = dates[dates.year.isin(years)]
+    random = numpy.random.default_rng(seed)
+    rows = 0
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    for first in range(0, cities, chunk_cities):
+        frames = []
+
+        for city in range(first, min(first + chunk_cities, cities)):
+            if city < len(CAPITALS):
+                name, region = CAPITALS[city], "Europe"
+            else:
+                name, region = "City " + str(city), REGIONS[city % len(REGIONS)]
+
+            temperatures = inject_errors(
+                seasonal_temperatures(
+                    dates,
+                    mean=random.uniform(-5, 25),
+                    amplitude=random.uniform(2, 16),
+                    random=random,
+                ),
+                error_rate,
+                random=random,
+                garbage=False,
+            )
+            temperatures = (temperatures * 9 / 5 + 32).round(1)
+            temperatures[random.random(len(dates)) < missing_rate] = -99
+
+            frames.append(
+                pandas.DataFrame(
+                    {
+                        "Region": region,
+                        "Country": "Country of " + name,
+                        "State": "",
+                        "City": name,
+                        "Month": dates.month,
+                        "Day": dates.day,
+                        "Year": dates.year,
+                        "AvgTemperature": temperatures,
+                    }
+                )
+            )
+
+        chunk = pandas.concat(frames, ignore_index=True)
+        chunk.to_csv(
+            path, mode="w" if first == 0 else "a", header=first == 0, index=False
+        )
+        rows += len(chunk)
+
+    return rows
+
+
+def parse_years(years: str) -> list:
+    """Years of a `2018`, `2010-2019` or `2016;2018` argument"""
+    if "-" in years:
+        start, end = map(int, years.split("-"))
+        return list(range(start, end + 1))
+
+    return [int(year) for year in years.split(";")]
+
+
+def run(args: list):
+    """Command line of the synthetic datasets
+
+    Args:
+        args (list): command line parameters as list of strings
+    """
+    parser = argparse.ArgumentParser(
+        description="Synthetic datasets in the layouts of the inputs"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    climate_parser = subparsers.add_parser(
+        "climate", help="write a workbook as Climat.xlsx"
+    )
+    climate_parser.add_argument("--output", default=".data/synthetic/Climat.xlsx")
+    climate_parser.add_argument("--year", type=int, default=2018)
+    climate_parser.add_argument("--error-rate", type=float, default=0.03)
+
+    observations_parser = subparsers.add_parser(
+        "observations", help="write a workbook as the FMI observations"
+    )
+    observations_parser.add_argument(
+        "--output", default=".data/synthetic/Savukoski kirkonkyla.xlsx"
+    )
+    observations_parser.add_argument("--years", type=parse_years, default=[2018])
+
+    capitals_parser = subparsers.add_parser(
+        "capitals", help="write a csv as the Kaggle dataset"
+    )
+    capitals_parser.add_argument(
+        "--output", default=".data/synthetic/city_temperature.csv"
+    )
+    capitals_parser.add_argument("--cities", type=int, default=len(DEFAULT_CAPITALS))
+    capitals_parser.add_argument("--years", type=parse_years, default=[2018])
+    capitals_parser.add_argument("--missing-rate", type=float, default=0.01)
+    capitals_parser.add_argument("--error-rate", type=float, default=0.001)
+
+    for subparser in (climate_parser, observations_parser, capitals_parser):
+        subparser.add_argument("--seed", type=int, default=0)
+
+    parsed = parser.parse_args(args)
+
+    if parsed.command == "climate":
+        write_climate_workbook(
+            parsed.output,
+            year=parsed.year,
+            error_rate=parsed.error_rate,
+            seed=parsed.seed,
+        )
+    elif parsed.command == "observations":
+        write_observations_workbook(parsed.output, years=parsed.years, seed=parsed.seed)
+    else:
+        rows = write_capitals_csv(
+            parsed.output,
+            cities=parsed.cities,
+            years=parsed.years,
+            missing_rate=parsed.missing_rate,
+            error_rate=parsed.error_rate,
+            seed=parsed.seed,
+        )
+        print("rows :", rows)
+
+    print("written :", parsed.output)
+
+
+if __name__ == "__main__":
+    run(sys.argv[1:])
@@ -0,0 +1,170 @@
+import bisect
+import contextlib
+import functools
+import math
+import threading
+import time
+
+# Upper bounds in seconds of the histogram buckets
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, math.inf)
+
+
+class StageTimings:
+    """Durations of the stages of the report, as counts, sums, maximums and histograms
+
+    Timings are kept by process, each worker of a WSGI server exposes its own.
+
+    Args:
+        buckets (tuple, optional): upper bounds in seconds of the histogram buckets, ending
+            with `math.inf`. Defaults to `BUCKETS`.
+    """
+
+    def __init__(self, buckets: tuple = BUCKETS):
+        self.buckets = buckets
+        self.stages = {}
+        self.lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float):
+        """Record one duration of a stage
+
+        Args:
+            stage (str): name of the stage
+            seconds (float): duration
+        """
+        with self.lock:
+            if stage not in self.stages:
+                self.stages[stage] = {
+                    "count": 0,
+                    "sum": 0.0,
+                    "max": 0.0,
+                    "buckets": [0] * len(self.buckets),
+                }
+
+            timings = self.stages[stage]
+            timings["count"] += 1
+            timings["sum"] += seconds
+            timings["max"] = max(timings["max"], seconds)
+            timings["buckets"][bisect.bisect_left(self.buckets, seconds)] += 1
+
+    @contextlib.contextmanager
+    def span(self, stage: str):
+        """Time the block of a `with` statement, even when it raises
+
+        Args:
+            stage (str): name of the stage
+        """
+        started = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def timed(self, stage: str):
+        """Decorator timing every call of a function
+
+        Args:
+            stage (str): name of the stage
+        """
+
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return function(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def snapshot(self) -> dict:
+        """Copy of the timings
+
+        Returns:
+            dict: `{stage: {"count", "sum", "max", "buckets"}}` sorted by stage
+        """
+        with self.lock:
+            return {
+                stage: dict(timings, buckets=list(timings["buckets"]))
+                for stage, timings in sorted(self.stages.items())
+            }
+
+    def prometheus(self, name: str = "capital_problem_stage_duration_seconds") -> str:
+        """Timings in the Prometheus text exposition format, one histogram labelled by stage
+
+        Args:
+            name (str, optional): name of the histogram. Defaults to "capital_problem_stage_duration_seconds".
+
+        Returns:
+            str: exposition text
+        """
+        lines = [
+            "# HELP " + name + " Duration of the stages of the report.",
+            "# TYPE " + name + " histogram",
+        ]
+
+        for stage, timings in self.snapshot().items():
+            label = 'stage="' + stage.replace("\\", "\\\\").replace('"', '\\"') + '"'
+            cumulated = 0
+
+            for bound, count in zip(self.buckets, timings["buckets"]):
+                cumulated += count
+                lines.append(
+                    name
+                    + "_bucket{"
+                    + label
+                    + ',le="'
+                    + ("+Inf" if bound == math.inf else repr(float(bound)))
+                    + '"} '
+                    + str(cumulated)
+                )
+
+            lines.append(name + "_sum{" + label + "} " + repr(timings["sum"]))
+            lines.append(name + "_count{" + label + "} " + str(timings["count"]))
+
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """Timings as a table, the longest stages first
+
+        Returns:
+            str: one line by stage with its count, total, mean and maximum
+        """
+        stages = sorted(
+            self.snapshot().items(), key=lambda item: item[1]["sum"], reverse=True
+        )
+        width = max([len(stage) for stage, _ in stages] + [5])
+        lines = ["stage".ljust(width) + "  count   total (s)   mean (ms)    max (ms)"]
+
+        for stage, timings in stages:
+            lines.append(
+                stage.ljust(width)
+                + "{:7d} {:11.3f} {:11.2f} {:11.2f}".format(
+                    timings["count"],
+                    timings["sum"],
+                    1000 * timings["sum"] / timings["count"],
+                    1000 * timings["max"],
+                )
+            )
+
+        return "\n".join(lines)
+
+
+@functools.lru_cache(maxsize=1)
+def get_stage_timings() -> StageTimings:
+    """Timings of the stages of this process
+
+    Returns:
+        StageTimings: shared timings
+    """
+    return StageTimings()
+
+
+def span(stage: str):
+    """`StageTimings.span` of the timings of this process"""
+    return get_stage_timings().span(stage)
+
+
+def timed(stage: str):
+    """`StageTimings.timed` of the timings of this process"""
+    return get_stage_timings().timed(stage)
@@ -0,0 +1,9 @@
+"""WSGI entry point of the report, for multi-worker servers
+
+gunicorn --preload --workers 4 --chdir src/capital_problem wsgi:server
+"""
+
+import core
+
+app = core.create_app()
+server = app.server
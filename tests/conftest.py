@@ -1,10 +1,21 @@
 # -*- coding: utf-8 -*-
 """
-    Dummy conftest.py for capital_problem.
+Dummy conftest.py for capital_problem.
 
-    If you don't know what this is for, just leave it empty.
-    Read more about conftest.py under:
-    https://pytest.org/latest/plugins.html
+If you don't know what this is for, just leave it empty.
+Read more about conftest.py under:
+https://pytest.org/latest/plugins.html
+
+The modules of the dashboard import each other as top-level modules, as when
+running `python src/capital_problem/core.py`, so their directory is put on the path.
 """
 
-# import pytest
+import os
+import sys
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "src", "capital_problem"
+    ),
+)
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+import json
+import numpy
+import pandas
+import pytest
+import dash_core_components
+import dash_html_components
+import plotly.graph_objects
+from capital_problem import artifact
+
+__author__ = "TheoLevalet"
+__copyright__ = "TheoLevalet"
+__license__ = "mit"
+
+
+def test_save_load(tmp_path):
+    path = str(tmp_path / "report.json")
+    figure = plotly.graph_objects.Figure(
+        plotly.graph_objects.Scatter(
+            x=pandas.date_range("2018-01-01", periods=3),
+            y=numpy.array([1.5, numpy.nan, 3.0]),
+        )
+    )
+    tabs = {
+        "tab-1": [
+            dash_html_components.H2("title", id="header"),
+            dash_html_components.Div(
+                children=[dash_core_components.Graph(id="graph", figure=figure)]
+            ),
+        ]
+    }
+
+    artifact.save(path, tabs, rankings=[{"name": "Helsinki"}], stages=["statistics"])
+    loaded = artifact.load(path)
+
+    header, div = loaded["tabs"]["tab-1"]
+    assert isinstance(header, dash_html_components.H2)
+    assert header.children == "title"
+    assert div.children[0] is loaded["components"]["graph"]
+    assert loaded["components"]["graph"].figure["data"][0]["y"] == [1.5, None, 3.0]
+    assert loaded["rankings"] == [{"name": "Helsinki"}]
+    assert loaded["stages"] == ["statistics"]
+
+    with open(path) as file:
+        payload = json.load(file)
+
+    payload["version"] = artifact.ARTIFACT_VERSION + 1
+
+    with open(path, "w") as file:
+        json.dump(payload, file)
+
+    with pytest.raises(ValueError):
+        artifact.load(path)
+
+
+def test_save_load_large_graph(tmp_path, monkeypatch):
+    import dashboard
+
+    monkeypatch.setenv("CHART_MAX_POINTS", "100")
+    dates = pandas.Series(pandas.date_range("2010-01-01", periods=3000))
+    values = pandas.Series(numpy.sin(numpy.arange(3000) / 30), name="SI")
+    values[10] = numpy.nan
+    chart = dashboard.build_large_time_series_chart(
+        dates=dates, data_list=[values], layout={}, id="annual-graph"
+    )
+
+    path = str(tmp_path / "report.json")
+    artifact.save(
+        path,
+        {"tab-1": [chart]},
+        rankings=[],
+        stages=[],
+        series={"annual-graph": dashboard.LARGE_GRAPH_SERIES["annual-graph"]},
+    )
+    loaded = artifact.load(path)
+
+    graph = loaded["components"][
+        artifact.component_key({"type": "large-graph", "index": "annual-graph"})
+    ]
+    assert len(graph.figure["data"][0]["x"]) == 100
+
+    # The series loaded by the server draw a window at full resolution
+    figure = dashboard.get_window_figure(
+        loaded["series"]["annual-graph"], ["2011-01-01", "2011-01-31"]
+    )
+    (trace,) = figure["data"]
+
+    assert len(trace.x) == 33
+    assert trace.y[1:-1] == pytest.approx(values[365:396].to_numpy())
+    assert figure["layout"]["xaxis"]["range"] == ["2011-01-01", "2011-01-31"]
+
+
+def test_create_app_stale_artifact(tmp_path, monkeypatch):
+    monkeypatch.setenv("DEBUG", "0")
+
+    import core
+
+    for name in ("Climat.xlsx", "Savukoski kirkonkyla.xlsx", "city_temperature.csv"):
+        (tmp_path / name).write_text("inputs")
+
+    monkeypatch.setenv("CLIMATE_PATH", str(tmp_path / "Climat.xlsx"))
+    monkeypatch.setenv("CLIMATE_SHEET_SI", "SI ")
+    monkeypatch.setenv("CLIMATE_SHEET_SI_ERROR", "SI -erreur")
+    monkeypatch.setenv(
+        "SPREADSHEET_SAVUKOSKI",
+        "Savukoski kirkonkyla;" + str(tmp_path / "Savukoski kirkonkyla.xlsx"),
+    )
+    monkeypatch.setenv(
+        "ALL_CAPITALS_SPREADSHEETS", str(tmp_path / "city_temperature.csv")
+    )
+    monkeypatch.setenv("REFERENCES_STORE", "")
+    monkeypatch.setenv("OUTLIERS_WINDOW", "5")
+    monkeypatch.setenv("REPORT_ARTIFACT", str(tmp_path / "report.json"))
+    monkeypatch.setattr(
+        core, "build_report_from_pipeline", lambda print_, preload: "pipeline"
+    )
+
+    artifact.save(
+        str(tmp_path / "report.json"),
+        tabs={
+            tab: [dash_html_components.H2(tab)] for tab in ("tab-1", "tab-2", "tab-3")
+        },
+        rankings=[],
+        stages=["statistics"],
+        sources=core.get_report_sources(),
+    )
+    assert core.create_app(preload=False) != "pipeline"
+
+    # Another setting, then another input file, make the artifact stale
+    monkeypatch.setenv("OUTLIERS_WINDOW", "7")
+    assert core.create_app(preload=False) == "pipeline"
+
+    monkeypatch.setenv("OUTLIERS_WINDOW", "5")
+    (tmp_path / "city_temperature.csv").write_text("inputs changed")
+    assert core.create_app(preload=False) == "pipeline"
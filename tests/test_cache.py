@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+import numpy
+import pandas
+from capital_problem import cache
+
+__author__ = "TheoLevalet"
+__copyright__ = "TheoLevalet"
+__license__ = "mit"
+
+
+def test_cached_dataframe(tmp_path):
+    source = tmp_path / "source.csv"
+    source.write_text("data")
+    dataframe = pandas.DataFrame(
+        {
+            "Day": ["01", "02", "03"],
+            "January": [1.5, "sun", numpy.nan],
+            "Temperature": numpy.array([1, 2, 3], dtype=numpy.float32),
+            "full_date": pandas.date_range("2018-01-01", periods=3),
+        },
+        index=[4, 5, 7],
+    )
+    builds = []
+
+    def build():
+        builds.append(True)
+        return dataframe
+
+    for _ in range(2):
+        cached = cache.cached_dataframe(
+            "stage", [str(source)], {"setting": 1}, build, directory=str(tmp_path)
+        )
+
+        pandas.testing.assert_frame_equal(cached, dataframe)
+
+    assert len(builds) == 1
+
+    cache.cached_dataframe(
+        "stage", [str(source)], {"setting": 2}, build, directory=str(tmp_path)
+    )
+
+    assert len(builds) == 2
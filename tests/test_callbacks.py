@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+import copy
+import json
+import callbacks
+
+__author__ = "TheoLevalet"
+__copyright__ = "TheoLevalet"
+__license__ = "mit"
+
+
+def test_zoom_in_dates():
+    figure = {
+        "data": [{"type": "scatter", "x": list(range(100)), "y": list(range(100))}],
+        "layout": {"title": {"text": "Temperatures"}},
+    }
+    sent = copy.deepcopy(figure)
+    click = {"points": [{"pointIndex": 50}]}
+
+    zoomed, state = callbacks.zoom_in_dates(click, None, figure, 10)
+
+    assert figure == sent
+    assert zoomed is not figure
+    assert list(zoomed.layout.xaxis.range) == [40, 60]
+    assert json.loads(state) == click
+
+    # Select the same point again to unzoom, from the zoomed figure of this session
+    zoomed_sent = zoomed.to_dict()
+    unzoomed, state = callbacks.zoom_in_dates(click, state, zoomed_sent, 10)
+
+    assert zoomed_sent == zoomed.to_dict()
+    assert list(unzoomed.layout.xaxis.range) == [0, 99]
+    assert json.loads(state) is None
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+import numpy
+import pandas
+from capital_problem import cleaning
+
+__author__ = "TheoLevalet"
+__copyright__ = "TheoLevalet"
+__license__ = "mit"
+
+
+def remove_outliers(series: pandas.Series) -> pandas.Series:
+    # Reference: rolling mean outliers of one series, interpolated by pandas
+    mean = series.rolling(window=5, center=True).mean().bfill().ffill()
+    return series.mask((series - mean).abs() > 10).interpolate()
+
+
+def test_clean_outliers():
+    random = numpy.random.default_rng(0)
+    values = pandas.Series(random.normal(0, 2, 300))
+    values[[100, 150, 200]] = [40.0, -35.0, 50.0]
+    values[[10, 11]] = numpy.nan
+    groups = pandas.Series(random.choice(["Oslo", "Riga", "Tallinn"], 300))
+
+    cleaned = cleaning.clean_outliers(values, groups=groups)
+
+    for name, indices in groups.groupby(groups).groups.items():
+        pandas.testing.assert_series_equal(
+            cleaned["values"][indices], remove_outliers(values[indices])
+        )
+
+    assert cleaned["counts"].sum() == cleaned["outliers"].sum() >= 3
+    assert cleaned["outliers"][[100, 150, 200]].all()
+
+    hampel = cleaning.clean_outliers(
+        values, groups=groups, method="hampel", threshold=3
+    )
+
+    assert hampel["outliers"][[100, 150, 200]].all()
+    assert not hampel["values"][[100, 150, 200]].isna().any()
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+
+import numpy
+import pandas
+import pytest
+import similaritymeasures
+from capital_problem import compute
+
+__author__ = "TheoLevalet"
+__copyright__ = "TheoLevalet"
+__license__ = "mit"
+
+
+def seasonal_series(size: int, shift: float = 0.0, seed: int = 0):
+    random = numpy.random.default_rng(seed)
+    days = numpy.arange(size)
+    return 10 * numpy.sin(days / 58 + shift) + random.normal(0, 2, size)
+
+
+def test_dtw_one_to_many():
+    query = seasonal_series(40)
+    candidates = numpy.array(
+        [seasonal_series(40, shift, seed) for seed, shift in enumerate([0.1, 0.5, 1])]
+    )
+
+    expected = [
+        numpy.sqrt(
+            similaritymeasures.dtw(
+                query[:, None], candidate[:, None], metric="sqeuclidean"
+            )[0]
+        )
+        for candidate in candidates
+    ]
+
+    assert compute.dtw_one_to_many(query, candidates) == pytest.approx(
+        expected, rel=1e-9
+    )
+
+
+def test_dtw_one_to_many_different_lengths():
+    query = seasonal_series(30)
+    candidate = seasonal_series(45, 0.3, 1)
+
+    expected = numpy.sqrt(
+        similaritymeasures.dtw(
+            query[:, None], candidate[:, None], metric="sqeuclidean"
+        )[0]
+    )
+
+    assert compute.dtw_one_to_many(query, candidate)[0] == pytest.approx(expected)
+
+
+def test_align_on_axis():
+    axis = pandas.Series(pandas.date_range("2018-01-01", periods=5))
+    xaxis = pandas.Series(axis.values[[0, 1, 3]])
+    values = pandas.Series(["1", "oops", "7"])
+
+    assert compute.align_on_axis(axis, xaxis, values).tolist() == [1, 3, 5, 7, 7]
+
+
+def test_dtw_one_to_many_window():
+    query = seasonal_series(50)
+    candidates = numpy.array([seasonal_series(50, 0.4, seed) for seed in range(4)])
+
+    lock_step = numpy.linalg.norm(candidates - query, axis=1)
+    unconstrained = compute.dtw_one_to_many(query, candidates)
+    banded = compute.dtw_one_to_many(query, candidates, window=3)
+
+    assert compute.dtw_one_to_many(query, candidates, window=0) == pytest.approx(
+        lock_step
+    )
+    assert numpy.all(unconstrained <= banded + 1e-9)
+    assert numpy.all(banded <= lock_step + 1e-9)
+
+
+def test_dtw_lower_bounds():
+    query = seasonal_series(60)
+    candidates = numpy.array([seasonal_series(60, 0.3, seed) for seed in range(8)])
+
+    for window in (0, 5, None):
+        distances = compute.dtw_one_to_many(query, candidates, window=window)
+
+        assert numpy.all(compute.lb_keogh(query, candidates, window) <= distances)
+        assert numpy.all(compute.lb_kim(query, candidates) <= distances)
+
+
+def test_dtw_top_k():
+    query = seasonal_series(60)
+    candidates = numpy.array(
+        [seasonal_series(60, shift, seed) for seed, shift in enumerate(range(40))]
+    )
+    distances = compute.dtw_one_to_many(query, candidates, window=5)
+
+    indices, best = compute.dtw_top_k(query, candidates, k=5, window=5, batch_size=4)
+
+    assert indices.tolist() == numpy.argsort(distances)[:5].tolist()
+    assert best == pytest.approx(numpy.sort(distances)[:5])
+
+    # Candidates shorter than the query are bounded by a first sweep
+    distances = compute.dtw_one_to_many(query, candidates[:, :50], window=12)
+
+    indices, best = compute.dtw_top_k(
+        query, candidates[:, :50], k=5, window=12, batch_size=4
+    )
+
+    assert indices.tolist() == numpy.argsort(distances)[:5].tolist()
+    assert best == pytest.approx(numpy.sort(distances)[:5])
+
+
+def test_stats_one_to_many_workers(monkeypatch):
+    # Without cache, forked workers can't reuse the metrics of the serial run
+    monkeypatch.setenv("STATS_CACHE_SIZE", "0")
+    compute.get_stats_cache.cache_clear()
+
+    dates = pandas.Series(pandas.date_range("2018-01-01", periods=30), name="dates")
+    values = pandas.Series(seasonal_series(30), name="values")
+    references = [
+        (
+            dates.rename("ref_dates"),
+            pandas.Series(seasonal_series(30, 0.2, seed), name="ref"),
+        )
+        for seed in range(3)
+    ]
+
+    try:
+        assert compute.get_stats_cache() is None
+
+        serial = compute.stats_one_to_many(dates, values, references)
+        parallel = compute.stats_one_to_many(dates, values, references, workers=2)
+    finally:
+        compute.get_stats_cache.cache_clear()
+
+    # Durations are only recorded by metrics computed, not read from a cache
+    assert all(set(stats.durations) == set(compute.METRICS) for stats in parallel)
+    assert [stats.computed for stats in parallel] == [
+        stats.computed for stats in serial
+    ]
+
+
+def test_frechet_distance():
+    curve_1 = numpy.column_stack([numpy.arange(40), seasonal_series(40)])
+    curve_2 = numpy.column_stack([numpy.arange(35) * 1.1, seasonal_series(35, 0.5, 1)])
+
+    expected = similaritymeasures.frechet_dist(curve_1, curve_2)
+
+    assert compute.frechet_distance(curve_1, curve_2) == pytest.approx(expected)
+    assert compute.frechet_within(curve_1, curve_2, expected)
+    assert not compute.frechet_within(curve_1, curve_2, expected * 0.99)
+
+
+def test_frechet_top_k():
+    days = numpy.arange(40)
+    query = numpy.column_stack([days, seasonal_series(40)])
+    candidates = [
+        numpy.column_stack([days, seasonal_series(40, shift, seed)])
+        for seed, shift in enumerate(numpy.linspace(0, 3, 25))
+    ]
+    distances = numpy.array(
+        [compute.frechet_distance(query, candidate) for candidate in candidates]
+    )
+
+    indices, best = compute.frechet_top_k(query, candidates, k=4)
+
+    assert indices.tolist() == numpy.argsort(distances, kind="stable")[:4].tolist()
+    assert best == pytest.approx(numpy.sort(distances)[:4])
+
+
+def test_area_between_curves():
+    days = numpy.arange(50)
+    curve_1 = numpy.column_stack([days, seasonal_series(50)])
+    curve_2 = numpy.column_stack([days, seasonal_series(50, 0.5, 1)])
+    curve_3 = numpy.column_stack([days[:45] * 1.1, seasonal_series(45, 0.5, 1)])
+
+    assert compute.area_between_curves(curve_1, curve_2) == pytest.approx(
+        similaritymeasures.area_between_two_curves(curve_1, curve_2)
+    )
+    assert compute.area_between_curves(curve_1, curve_3) == pytest.approx(
+        similaritymeasures.area_between_two_curves(curve_1, curve_3)
+    )
+
+
+def test_partial_curve_mapping():
+    days = numpy.arange(50)
+    curve_1 = numpy.column_stack([days, seasonal_series(50)])
+    curve_2 = numpy.column_stack([days, seasonal_series(50, 0.5, 1)])
+    curve_3 = numpy.column_stack([days[:45] * 1.1, seasonal_series(45, 0.5, 2)])
+
+    for curves in [(curve_1, curve_2), (curve_2, curve_1), (curve_1, curve_3)]:
+        assert compute.partial_curve_mapping(*curves) == pytest.approx(
+            similaritymeasures.pcm(*curves)
+        )
+
+
+def test_stats_between_series_metrics():
+    dates = pandas.Series(pandas.date_range("2018-01-01", periods=30), name="dates")
+    values_1 = pandas.Series(seasonal_series(30), name="values_1")
+    values_2 = pandas.Series(seasonal_series(30, 0.2, 1), name="values_2")
+
+    stats = compute.stats_between_series(
+        dates, values_1, dates.rename("dates_2"), values_2, metrics=("dtw", "std")
+    )
+
+    assert set(stats.computed) == {"dtw", "std"}
+    assert stats["pcm"] == pytest.approx(
+        compute.stats_between_series(dates, values_1, dates.rename("d"), values_2)[
+            "pcm"
+        ]
+    )
+    assert list(stats) == list(compute.METRICS)
+
+
+def test_sliding_distances():
+    query = seasonal_series(30)
+    series = seasonal_series(200, 0.3, 1)
+    windows = numpy.lib.stride_tricks.sliding_window_view(series, 30)
+
+    def znormalize(values):
+        return (values - values.mean(axis=-1, keepdims=True)) / values.std(
+            axis=-1, keepdims=True
+        )
+
+    assert compute.sliding_distances(query, series) == pytest.approx(
+        numpy.linalg.norm(windows - query, axis=1)
+    )
+    assert compute.sliding_distances(query, series, normalize=True) == pytest.approx(
+        numpy.linalg.norm(znormalize(windows) - znormalize(query), axis=1)
+    )
+
+
+def test_best_offsets():
+    distances = numpy.array([5.0, 1.0, 0.5, 3.0, 4.0, 0.7, 2.0])
+
+    assert compute.best_offsets(distances, k=2, exclusion=3).tolist() == [2, 5]
+
+
+def test_lttb():
+    x = numpy.arange(1000)
+    y = numpy.sin(x / 50.0)
+    y[500] = 10.0
+    y[600] = numpy.nan
+
+    indices = compute.lttb(x, y, 100)
+
+    assert len(indices) == 100
+    assert indices[0] == 0 and indices[-1] == 999
+    assert numpy.all(numpy.diff(indices) > 0)
+    assert 500 in indices
+    assert 600 not in indices
+    numpy.testing.assert_array_equal(compute.lttb(x, y, 2000), x)
+
+
+def test_stats_cache(tmp_path):
+    stats_cache = compute.StatsCache(size=2, directory=str(tmp_path))
+
+    assert stats_cache.get("ab01") is None
+    stats_cache.set("ab01", 1.5)
+    stats_cache.set("ab02", 2.5)
+    stats_cache.set("ab03", 3.5)
+
+    assert stats_cache.get("ab03") == 3.5
+    assert "ab01" not in stats_cache.entries
+    assert stats_cache.get("ab01") == 1.5
+    assert compute.StatsCache(directory=str(tmp_path)).get("ab02") == 2.5
+    assert stats_cache.counters() == {
+        "hits": 1,
+        "disk_hits": 1,
+        "misses": 1,
+        "entries": 2,
+    }
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+import numpy
+import pandas
+import pytest
+import content
+import store
+
+__author__ = "TheoLevalet"
+__copyright__ = "TheoLevalet"
+__license__ = "mit"
+
+
+@pytest.fixture
+def temperature_store(tmp_path, monkeypatch):
+    dates = pandas.date_range("2017-01-01", "2018-12-31")
+    frames = []
+
+    for city, region, fahrenheit in (
+        ("Oslo", "Europe", 41.0),
+        ("Riga", "Europe", 50.0),
+        ("Tokyo", "Asia", 59.0),
+    ):
+        temperatures = numpy.full(len(dates), fahrenheit)
+        frames.append(
+            pandas.DataFrame(
+                {
+                    "Region": region,
+                    "City": city,
+                    "Month": dates.month,
+                    "Day": dates.day,
+                    "Year": dates.year,
+                    "AvgTemperature": temperatures,
+                }
+            )
+        )
+
+    dataset = pandas.concat(frames, ignore_index=True)
+    # A spike and an unset temperature in Oslo, the 2018-06-15 and 2018-06-20
+    dataset.loc[
+        (dataset["City"] == "Oslo") & (dataset.index == 530), "AvgTemperature"
+    ] = 140
+    dataset.loc[
+        (dataset["City"] == "Oslo") & (dataset.index == 535), "AvgTemperature"
+    ] = -99
+    dataset.to_csv(tmp_path / "city_temperature.csv", index=False)
+    store.ingest(str(tmp_path / "city_temperature.csv"), str(tmp_path / "store"))
+
+    monkeypatch.setenv("REFERENCES_STORE", str(tmp_path / "store"))
+    monkeypatch.setenv("CACHE_PATH", "")
+    monkeypatch.setenv("ALL_CAPITALS_SPREADSHEETS_COLUMNS", store.DEFAULT_COLUMNS)
+    monkeypatch.setenv("OUTLIERS_METHOD", "rolling_mean")
+    monkeypatch.setenv("OUTLIERS_WINDOW", "5")
+    monkeypatch.setenv("OUTLIERS_THRESHOLD", "10")
+
+    return store.TemperatureStore(str(tmp_path / "store"))
+
+
+def test_read_all_capitals_spreadsheets_from_store(temperature_store):
+    spreadsheets = content.read_all_capitals_spreadsheets(
+        filters={"Year": [2018], "Region": ["Europe"]}
+    )
+
+    assert spreadsheets["Capital"].value_counts().to_dict() == {
+        "Oslo": 365,
+        "Riga": 365,
+    }
+    assert spreadsheets.dtypes.astype(str).to_dict() == {
+        "Year": "int16",
+        "Month": "int16",
+        "Day": "int16",
+        "Temperature": "float32",
+        "Capital": "category",
+        "Region": "category",
+    }
+
+    # In °C, the spike and the unset day are interpolated from their neighbours
+    oslo = spreadsheets[spreadsheets["Capital"] == "Oslo"]
+    assert oslo["Temperature"].to_numpy() == pytest.approx(numpy.full(365, 5.0))
+    riga = spreadsheets[spreadsheets["Capital"] == "Riga"]
+    assert riga["Temperature"].to_numpy() == pytest.approx(numpy.full(365, 10.0))
+
+    dates = content.create_date_column(oslo["Year"], oslo["Month"], oslo["Day"])
+    assert dates.iloc[0] == pandas.Timestamp("2018-01-01")
+    assert dates.iloc[-1] == pandas.Timestamp("2018-12-31")
+
+
+def test_read_store_spreadsheets_no_match(temperature_store):
+    spreadsheets = content.read_store_spreadsheets(temperature_store, {"Year": [1995]})
+
+    assert spreadsheets.empty
+    assert spreadsheets.columns.tolist() == [
+        "Year",
+        "Month",
+        "Day",
+        "Temperature",
+        "Capital",
+        "Region",
+    ]
+    assert content.read_all_capitals_spreadsheets(filters={"Capital": ["Lima"]}).empty
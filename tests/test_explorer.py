@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+import numpy
+import pandas
+from capital_problem import explorer
+
+__author__ = "TheoLevalet"
+__copyright__ = "TheoLevalet"
+__license__ = "mit"
+
+
+def test_page():
+    data_explorer = explorer.DataExplorer(
+        pandas.DataFrame(
+            {
+                "Capital": ["Oslo", "Helsinki", "Oslo", "Helsinki", "Riga"],
+                "Date": pandas.to_datetime(
+                    [
+                        "2018-01-01",
+                        "2018-01-01",
+                        "2018-01-02",
+                        "2019-01-02",
+                        "2018-01-01",
+                    ]
+                ),
+                "Temperature": numpy.array([1.0, -5.0, numpy.nan, 3.0, 0.5]),
+            }
+        )
+    )
+
+    records, page_count, row_count = data_explorer.page(0, 2)
+
+    assert (page_count, row_count) == (3, 5)
+    assert records[0] == {"Capital": "Oslo", "Date": "2018-01-01", "Temperature": 1.0}
+    assert records[1]["Capital"] == "Helsinki"
+
+    records, page_count, row_count = data_explorer.page(
+        0,
+        10,
+        sort_by=[
+            {"column_id": "Capital", "direction": "asc"},
+            {"column_id": "Date", "direction": "desc"},
+        ],
+        filter_query='{Capital} contains "s" && {Date} datestartswith 2018',
+    )
+
+    assert row_count == 3
+    assert [record["Capital"] for record in records] == ["Helsinki", "Oslo", "Oslo"]
+    assert records[1]["Temperature"] is None
+
+    records, _, row_count = data_explorer.page(
+        0, 10, filter_query="{Temperature} s> 0.5 && {Unknown} = 1"
+    )
+
+    assert row_count == 2
+    assert sorted(record["Temperature"] for record in records) == [1.0, 3.0]
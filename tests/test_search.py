@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+import numpy
+import pandas
+import pytest
+import search
+import store
+
+__author__ = "TheoLevalet"
+__copyright__ = "TheoLevalet"
+__license__ = "mit"
+
+
+def test_calendar_shift():
+    new_year = pandas.Timestamp("2018-01-01")
+    leap_day = pandas.Timestamp("2016-02-29")
+
+    assert search.calendar_shift(new_year, pandas.Timestamp("2017-12-29")) == -3
+    assert search.calendar_shift(new_year, pandas.Timestamp("2015-01-05")) == 4
+    assert search.calendar_shift(leap_day, pandas.Timestamp("2017-03-02")) == 2
+    assert search.calendar_shift(leap_day, pandas.Timestamp("2020-02-27")) == -2
+
+
+def test_search_subsequences(tmp_path):
+    dates = pandas.date_range("2010-01-01", "2013-12-31")
+    rng = numpy.random.default_rng(0)
+    fahrenheit = (
+        40 + 20 * numpy.sin(numpy.arange(len(dates)) / 9) + rng.normal(0, 1, len(dates))
+    )
+    pandas.DataFrame(
+        {
+            "Region": "Europe",
+            "City": "Oslo",
+            "Month": dates.month,
+            "Day": dates.day,
+            "Year": dates.year,
+            "AvgTemperature": fahrenheit,
+        }
+    ).to_csv(tmp_path / "city_temperature.csv", index=False)
+    store.ingest(str(tmp_path / "city_temperature.csv"), str(tmp_path / "store"))
+
+    # The query is the stored history from 2011-12-29, dated from 2013-01-01
+    offset = dates.get_loc(pandas.Timestamp("2011-12-29"))
+    query_dates = pandas.Series(pandas.date_range("2013-01-01", periods=60))
+    query_values = pandas.Series((fahrenheit[offset : offset + 60] - 32) * 5 / 9)
+
+    matches = search.search_subsequences(
+        query_dates,
+        query_values,
+        store.TemperatureStore(str(tmp_path / "store")),
+        per_city=1,
+    )
+
+    assert len(matches) == 1
+    assert matches[0]["name"] == "Oslo"
+    assert matches[0]["start"] == pandas.Timestamp("2011-12-29")
+    assert matches[0]["shift"] == -3
+    assert matches[0]["distance"] < 0.1
+
+
+def test_search_references(tmp_path):
+    dates = pandas.date_range("2015-01-01", "2017-12-31")
+    rng = numpy.random.default_rng(0)
+    frames = []
+
+    for city, region in (("Oslo", "Europe"), ("Riga", "Europe"), ("Tokyo", "Asia")):
+        frames.append(
+            pandas.DataFrame(
+                {
+                    "Region": region,
+                    "City": city,
+                    "Month": dates.month,
+                    "Day": dates.day,
+                    "Year": dates.year,
+                    "AvgTemperature": rng.normal(50, 10, len(dates)).astype(
+                        numpy.float32
+                    ),
+                }
+            )
+        )
+
+    dataset = pandas.concat(frames, ignore_index=True)
+    query_dates = pandas.Series(pandas.date_range("2018-03-01", periods=60))
+    stamps = pandas.DatetimeIndex(numpy.tile(dates, 3))
+
+    def rows(city, year, days):
+        window = pandas.date_range(f"{year}-03-01", periods=60)[days]
+        return dataset.index[(dataset["City"] == city) & stamps.isin(window)]
+
+    # Oslo misses 3 days of the query in 2016, interpolated, and 30 in 2017, dropped
+    oslo_2016 = dataset.loc[rows("Oslo", 2016, slice(None)), "AvgTemperature"]
+    dataset.loc[rows("Oslo", 2016, [10, 20, 30]), "AvgTemperature"] = -99
+    dataset.loc[rows("Oslo", 2017, slice(0, 30)), "AvgTemperature"] = -99
+    dataset.to_csv(tmp_path / "city_temperature.csv", index=False)
+    store.ingest(str(tmp_path / "city_temperature.csv"), str(tmp_path / "store"))
+    temperature_store = store.TemperatureStore(str(tmp_path / "store"))
+
+    years, values = search.get_candidates(temperature_store, "Oslo", query_dates)
+    celsius = (oslo_2016.to_numpy(dtype=numpy.float64) - 32) * 5 / 9
+
+    assert years.tolist() == [2015, 2016]
+    assert values[1, [9, 11, 19, 21]] == pytest.approx(celsius[[9, 11, 19, 21]])
+    assert values[1, [10, 20, 30]] == pytest.approx(
+        (celsius[[9, 19, 29]] + celsius[[11, 21, 31]]) / 2
+    )
+
+    # The query is Riga's 2016 spring, dated from 2018
+    query_values = pandas.Series(
+        (
+            dataset.loc[rows("Riga", 2016, slice(None)), "AvgTemperature"].to_numpy(
+                dtype=numpy.float64
+            )
+            - 32
+        )
+        * 5
+        / 9
+    )
+
+    references = search.search_references(
+        query_dates, query_values, temperature_store, shortlist=4
+    )
+
+    assert len(references) == 4
+    assert (references[0]["name"], references[0]["year"]) == ("Riga", 2016)
+    assert references[0]["dtw"] == pytest.approx(0)
+    assert (
+        len(search.search_references(query_dates, query_values, temperature_store)) == 8
+    )
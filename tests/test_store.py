@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+import numpy
+import pandas
+from capital_problem import store
+
+__author__ = "TheoLevalet"
+__copyright__ = "TheoLevalet"
+__license__ = "mit"
+
+
+def test_ingest(tmp_path):
+    dates = pandas.date_range("2017-12-30", "2019-01-02")
+    dataset = pandas.DataFrame(
+        {
+            "Region": "Europe",
+            "City": "Oslo",
+            "Month": dates.month,
+            "Day": dates.day,
+            "Year": dates.year,
+            "AvgTemperature": numpy.arange(len(dates), dtype=float),
+        }
+    ).drop(index=[5])
+    dataset.loc[10, "AvgTemperature"] = -99
+    dataset.to_csv(tmp_path / "city_temperature.csv", index=False)
+
+    store.ingest(str(tmp_path / "city_temperature.csv"), str(tmp_path / "store"))
+    temperature_store = store.TemperatureStore(str(tmp_path / "store"))
+
+    assert temperature_store.cities == ["Oslo"]
+    assert temperature_store.years("Oslo") == [2017, 2018, 2019]
+
+    days, temperatures = temperature_store.temperatures("Oslo", 2018, 2018)
+
+    assert len(days) == 365 and days[0] == pandas.Timestamp("2018-01-01")
+    assert temperatures[0] == 2
+    assert numpy.isnan(temperatures[3]) and numpy.isnan(temperatures[8])
+    assert len(temperature_store.temperatures("Oslo")[1]) == len(dates)
+
+
+def test_assemble_dates():
+    dates = store.assemble_dates(
+        pandas.Series([2018, 2020, 2019, 2018, 201], dtype="int16"),
+        pandas.Series([2, 2, 2, 13, 12], dtype="int16"),
+        pandas.Series([28, 29, 29, 1, 31], dtype="int16"),
+    )
+
+    assert dates.tolist()[:2] == [
+        pandas.Timestamp("2018-02-28"),
+        pandas.Timestamp("2020-02-29"),
+    ]
+    assert dates[2:].isna().all()
+
+
+def test_read_filtered_csv(tmp_path):
+    dataset = pandas.DataFrame(
+        {
+            "Region": ["Europe", "Asia", "Europe", "Europe", "Asia", "Europe"],
+            "City": ["Oslo", "Tokyo", "Riga", "Oslo", "Seoul", "Paris"],
+            "Year": [2018, 2018, 2018, 2019, 2019, 2019],
+            "AvgTemperature": [1.5, 2.5, 3.5, 4.5, 5.5, 6.5],
+        }
+    )
+    dataset.to_csv(tmp_path / "city_temperature.csv", index=False)
+
+    # Chunks of 2 rows, each parsed with its own categories
+    filtered = store.read_filtered_csv(
+        str(tmp_path / "city_temperature.csv"),
+        columns={"Year": "Year", "City": "Capital", "Region": "Region"},
+        dtypes={"Year": "int16", "City": "category", "Region": "category"},
+        filters={"Region": ["Europe"], "Capital": ["Oslo", "Riga"]},
+        chunksize=2,
+    )
+
+    assert filtered["Capital"].tolist() == ["Oslo", "Riga", "Oslo"]
+    assert filtered["Year"].tolist() == [2018, 2018, 2019]
+    assert filtered.dtypes.astype(str).to_dict() == {
+        "Year": "int16",
+        "Capital": "category",
+        "Region": "category",
+    }
+    assert filtered["Capital"].cat.categories.tolist() == ["Oslo", "Riga"]
+
+
+def test_read_filtered_csv_no_match(tmp_path):
+    pandas.DataFrame({"Region": ["Europe"], "City": ["Oslo"], "Year": [2018]}).to_csv(
+        tmp_path / "city_temperature.csv", index=False
+    )
+
+    filtered = store.read_filtered_csv(
+        str(tmp_path / "city_temperature.csv"),
+        columns={"Year": "Year", "City": "Capital", "Region": "Region"},
+        dtypes={"Year": "int16", "City": "category", "Region": "category"},
+        filters={"Year": [1995]},
+    )
+
+    assert filtered.empty
+    assert filtered.dtypes.astype(str).to_dict() == {
+        "Year": "int16",
+        "Capital": "category",
+        "Region": "category",
+    }
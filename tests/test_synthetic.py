@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+import importlib
+import pandas
+from capital_problem import synthetic
+
+__author__ = "TheoLevalet"
+__copyright__ = "TheoLevalet"
+__license__ = "mit"
+
+
+def test_write_climate_workbook(tmp_path):
+    path = str(tmp_path / "Climat.xlsx")
+    synthetic.write_climate_workbook(
+        path, sheets={"SI ": False, "SI -erreur": True}, error_rate=0.1
+    )
+
+    # Read as `content.read_reference_spreadsheets` with the `.env.dist` settings
+    sheets = pandas.read_excel(
+        path, sheet_name=["SI ", "SI -erreur"], skiprows=2, usecols="C:O"
+    )
+
+    assert sheets["SI "].iloc[:, 0].tolist() == ["J" + str(day) for day in range(1, 32)]
+    assert sheets["SI "].iloc[:, 1:].notna().sum().sum() == 365
+    assert sheets["SI "].iloc[29:, 2].isna().all()
+
+    errors = sheets["SI -erreur"].iloc[:, 1:]
+    garbage = errors.isin(synthetic.GARBAGE).sum().sum()
+    spikes = (
+        pandas.to_numeric(errors.stack(), errors="coerce")
+        - sheets["SI "].iloc[:, 1:].stack()
+    ).abs() >= 20
+
+    assert garbage > 0 and spikes.sum() > 0
+    assert garbage + spikes.sum() < 0.2 * 365
+
+
+def test_write_capitals_csv(tmp_path):
+    path = str(tmp_path / "city_temperature.csv")
+    rows = synthetic.write_capitals_csv(
+        path, cities=35, years=[2017, 2018], chunk_cities=10
+    )
+    dataset = pandas.read_csv(path)
+
+    assert rows == len(dataset) == 35 * 730
+    assert dataset.columns.tolist() == [
+        "Region",
+        "Country",
+        "State",
+        "City",
+        "Month",
+        "Day",
+        "Year",
+        "AvgTemperature",
+    ]
+    assert dataset["City"].nunique() == 35
+    assert set(synthetic.CAPITALS) <= set(dataset["City"])
+    assert (dataset["AvgTemperature"] == -99).any()
+
+
+def test_write_capitals_csv_without_capitals_list(tmp_path, monkeypatch):
+    # The benchmarks clear the list of capitals to compare every city
+    monkeypatch.setenv("CAPITALS_LIST", "")
+    empty = importlib.reload(synthetic)
+    monkeypatch.undo()
+
+    try:
+        path = str(tmp_path / "city_temperature.csv")
+        rows = empty.write_capitals_csv(path)
+        dataset = pandas.read_csv(path)
+
+        assert empty.CAPITALS == empty.DEFAULT_CAPITALS
+        assert rows == len(dataset) == len(empty.DEFAULT_CAPITALS) * 365
+        assert sorted(dataset["City"].unique()) == sorted(empty.DEFAULT_CAPITALS)
+    finally:
+        importlib.reload(synthetic)
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from capital_problem import timing
+
+__author__ = "TheoLevalet"
+__copyright__ = "TheoLevalet"
+__license__ = "mit"
+
+
+def test_stage_timings():
+    timings = timing.StageTimings(buckets=(0.01, 1, float("inf")))
+    timings.observe("content.melt", 0.005)
+    timings.observe("content.melt", 0.5)
+
+    @timings.timed("compute.dtw")
+    def fail():
+        raise ValueError()
+
+    with pytest.raises(ValueError):
+        fail()
+
+    snapshot = timings.snapshot()
+
+    assert list(snapshot) == ["compute.dtw", "content.melt"]
+    assert snapshot["content.melt"]["count"] == 2
+    assert snapshot["content.melt"]["sum"] == pytest.approx(0.505)
+    assert snapshot["content.melt"]["buckets"] == [1, 1, 0]
+    assert snapshot["compute.dtw"]["count"] == 1
+
+    exposition = timings.prometheus(name="stage_seconds")
+
+    assert 'stage_seconds_bucket{stage="content.melt",le="0.01"} 1' in exposition
+    assert 'stage_seconds_bucket{stage="content.melt",le="+Inf"} 2' in exposition
+    assert 'stage_seconds_count{stage="content.melt"} 2' in exposition
+    assert timings.summary().splitlines()[1].startswith("content.melt")